@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Repeatable benchmark for the download and parse hot paths
+Downloads every committed layer from a local mirror (local_mirror.py) into
+a scratch directory with the real download engine, then parses each layer
+in a fresh subprocess so peak RSS is measured per layer. Results go to a
+JSON report; --compare prints the change between two reports.
+
+    python benchmark.py                          # writes bench/<timestamp>.json
+    python benchmark.py --rounds 5 --output before.json
+    python benchmark.py --compare before.json after.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: peak RSS is not reported
+
+from downloader import run_downloads
+from local_mirror import start_mirror
+from reader import FEATURES_ROOT, iter_features
+
+# Configuration
+bench_root = "bench"
+rounds = 3
+download_workers = 4
+parsers = ["json", "reader"]  # json.load of the whole file, and the streaming reader
+
+MB = 1024 * 1024
+REPORT_VERSION = 1
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / MB if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB elsewhere
+
+
+def parse_once(path, parser):
+    """Parse one layer in this process; returns the measurements as a dict"""
+    before = peak_rss_mb()
+    started = time.perf_counter()
+    if parser == "json":
+        with open(path) as f:
+            features = len(json.load(f)["features"])
+    else:
+        features = sum(1 for _ in iter_features(path))
+    seconds = time.perf_counter() - started
+    return {"seconds": seconds, "features": features, "rss_before_mb": before, "peak_rss_mb": peak_rss_mb()}
+
+
+def bench_parse(path, parser, repeat):
+    """Run parse_once in `repeat` fresh interpreters; times are per run, RSS is the worst seen"""
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, __file__, "--parse-worker", path, parser],
+                                check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output))
+
+    size_mb = os.path.getsize(path) / MB
+    seconds = statistics.median(run["seconds"] for run in runs)
+    row = {"features": runs[0]["features"], "seconds_median": round(seconds, 6),
+           "seconds_min": round(min(run["seconds"] for run in runs), 6),
+           "ms_per_mb": round(seconds * 1000 / size_mb, 3) if size_mb else None}
+    if runs[0]["peak_rss_mb"] is not None:
+        row["peak_rss_mb"] = round(max(run["peak_rss_mb"] for run in runs), 2)
+        row["rss_growth_mb"] = round(max(run["peak_rss_mb"] - run["rss_before_mb"] for run in runs), 2)
+    return row
+
+
+def bench_downloads(repeat, workers):
+    """Fetch every mirrored layer `repeat` times; wall-clock and per-file numbers"""
+    server, base_url = start_mirror(root=".")
+    try:
+        names = sorted(route.lstrip('/') for route in server.RequestHandlerClass.routes)
+        walls, totals = [], []
+        per_file = {name: {"ttfb_ms": [], "mb_per_s": [], "bytes": 0} for name in names}
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as scratch:
+                jobs = [{"name": name, "url": base_url + name, "path": os.path.join(scratch, name)} for name in names]
+                started = time.perf_counter()
+                results = list(run_downloads(jobs, workers, rate=1e6, burst=len(jobs)))
+                walls.append(time.perf_counter() - started)
+
+            failed = [result["name"] for result in results if result["status"] != "downloaded"]
+            if failed:
+                raise RuntimeError(f"Mirror downloads failed: {', '.join(failed)}")
+            totals.append(sum(result["bytes"] for result in results))
+            for result in results:
+                stats = per_file[result["name"]]
+                stats["bytes"] = result["bytes"]
+                stats["ttfb_ms"].append(result["ttfb"] * 1000)
+                stats["mb_per_s"].append(result["bytes"] / MB / result["seconds"] if result["seconds"] else 0.0)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    wall = statistics.median(walls)
+    return {
+        "workers": workers,
+        "files": len(names),
+        "bytes": totals[0] if totals else 0,
+        "seconds_median": round(wall, 6),
+        "mb_per_s_median": round(totals[0] / MB / wall, 3) if totals and wall else None,
+        "per_file": {name: {"bytes": stats["bytes"],
+                            "ttfb_ms_median": round(statistics.median(stats["ttfb_ms"]), 3),
+                            "mb_per_s_median": round(statistics.median(stats["mb_per_s"]), 3)}
+                     for name, stats in per_file.items() if stats["ttfb_ms"]},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(repeat=None, workers=None, root=FEATURES_ROOT):
+    """Full benchmark; returns the report dict"""
+    repeat = repeat or rounds
+    workers = workers or download_workers
+    report = {
+        "version": REPORT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "rounds": repeat,
+    }
+
+    print(f"Downloading from local mirror ({repeat} rounds, {workers} workers)...")
+    report["download"] = bench_downloads(repeat, workers)
+    download = report["download"]
+    print(f"   {download['files']} files, {download['bytes'] / MB:.2f} MB in {download['seconds_median']:.3f}s "
+          f"({download['mb_per_s_median']} MB/s)")
+
+    report["layers"] = {}
+    for dirpath, _, files in sorted(os.walk(root)):
+        for file in sorted(files):
+            if not file.endswith('.geojson'):
+                continue
+            path = os.path.join(dirpath, file)
+            name = file[:-len('.geojson')]
+            layer = {"bytes": os.path.getsize(path)}
+            for parser in parsers:
+                layer[parser] = bench_parse(path, parser, repeat)
+            report["layers"][name] = layer
+
+            summary = ", ".join(f"{parser} {layer[parser]['ms_per_mb']} ms/MB"
+                                + (f" peak {layer[parser]['peak_rss_mb']} MB" if "peak_rss_mb" in layer[parser] else "")
+                                for parser in parsers)
+            print(f"   {name}: {summary}")
+    return report
+
+
+def flatten(report, prefix=""):
+    """{"a.b.c": number} for every numeric leaf, so reports compare key by key"""
+    values = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+
+def compare_reports(old_path, new_path):
+    with open(old_path) as f:
+        old = flatten(json.load(f))
+    with open(new_path) as f:
+        new = flatten(json.load(f))
+
+    skip = ("version", "rounds", "cpus", "workers", "files", "bytes", "features")
+    for key in sorted(set(old) & set(new)):
+        if key.split('.')[-1] in skip:
+            continue
+        before, after = old[key], new[key]
+        change = f"{100.0 * (after - before) / before:+7.1f}%" if before else "    n/a"
+        print(f"{key:<70} {before:>14,.3f} -> {after:>14,.3f}  {change}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--parse-worker":
+        print(json.dumps(parse_once(sys.argv[2], sys.argv[3])))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmark downloads and layer parsing against a local mirror")
+    parser.add_argument("--rounds", type=int, help=f"repetitions per measurement (default {rounds})")
+    parser.add_argument("--workers", type=int, help=f"download workers (default {download_workers})")
+    parser.add_argument("--output", help="report path (default bench/<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="print the change between two reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        sys.exit(0)
+
+    report = run_benchmark(args.rounds, args.workers)
+    output = args.output or os.path.join(bench_root, datetime.now().strftime('%Y%m%d-%H%M%S') + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"\nReport written to {output}")
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Columnar attribute store for layers under features/
+Writes a <layer>.geojson.cols sidecar holding every property as its own
+typed column. Numbers are narrowed int/float arrays, strings are
+dictionary encoded (sorted, so code order is string order) and nulls live
+in validity bitmaps. Queries memory-map the sidecar and touch only the
+columns they name, and geometry is never read:
+
+    python columnar.py ne_10m_airports name,iata_code "type == major" "scalerank <= 3"
+
+The sectioned container (JSON header + 8-byte aligned NumPy sections) is
+shared with topobin.py.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+from reader import FEATURES_ROOT, iter_properties, layer_path
+from sync_manifest import file_fingerprint
+
+SIDECAR_SUFFIX = ".cols"
+
+_MAGIC = b"NECOLS\x00\x01"
+_PREAMBLE = struct.Struct("<8sII")  # magic, header length, reserved
+_NULL_CODE = {np.dtype(np.uint8): 0xFF, np.dtype(np.uint16): 0xFFFF, np.dtype(np.uint32): 0xFFFFFFFF}
+_INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+class Sections:
+    """Named arrays laid out back to back on 8-byte boundaries"""
+
+    def __init__(self):
+        self.arrays = {}
+
+    def add(self, name, array):
+        self.arrays[name] = np.ascontiguousarray(array)
+        return name
+
+    def layout(self):
+        directory = {}
+        offset = 0
+        for name, array in self.arrays.items():
+            directory[name] = {"offset": offset, "dtype": array.dtype.str, "count": int(array.size)}
+            offset = _align(offset + array.nbytes)
+        return directory
+
+    def write(self, f, directory):
+        position = 0
+        for name, array in self.arrays.items():
+            f.write(b'\0' * (directory[name]["offset"] - position))
+            f.write(array.tobytes())
+            position = directory[name]["offset"] + array.nbytes
+
+
+def write_sectioned(path, magic, header, sections):
+    """Write header + sections to path atomically"""
+    header = dict(header, sections=sections.layout())
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    header_bytes += b' ' * (_align(_PREAMBLE.size + len(header_bytes)) - _PREAMBLE.size - len(header_bytes))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(magic, len(header_bytes), 0))
+        f.write(header_bytes)
+        sections.write(f, header["sections"])
+    os.replace(tmp_path, path)
+
+
+def read_sectioned_header(path, magic):
+    """Only the JSON header of a sectioned file"""
+    with open(path, 'rb') as f:
+        found, length, _ = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if found != magic:
+            raise ValueError(f"{path} has an unexpected format")
+        return json.loads(f.read(length))
+
+
+class MappedSections:
+    """Memory-mapped sectioned file; every section is a zero-copy NumPy view"""
+
+    magic = None
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, length, _ = _PREAMBLE.unpack_from(self.buf, 0)
+        if magic != self.magic:
+            self.close()
+            raise ValueError(f"{path} has an unexpected format")
+        self.header = json.loads(bytes(self.buf[_PREAMBLE.size:_PREAMBLE.size + length]))
+        self._data_start = _PREAMBLE.size + length
+        self._arrays = {}
+        self.columns = {column["name"]: column for column in self.header.get("columns", [])}
+
+    @classmethod
+    def open_sidecar(cls, layer, suffix, root=FEATURES_ROOT):
+        """
+        Open layer's <suffix> sidecar, first (re)building it with cls.build when
+        it is missing, not in cls.magic format or older than the source
+        """
+        path = layer_path(layer, root)
+        sidecar = path + suffix
+        try:
+            previous = read_sectioned_header(sidecar, cls.magic).get("source")
+        except (OSError, ValueError):
+            previous = None
+        fingerprint = file_fingerprint(path, previous)
+        if previous != fingerprint:
+            cls.build(path, fingerprint=fingerprint)
+        return cls(sidecar)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Views must be released before the map can be closed; if a caller
+        # still holds one, the map is unmapped by GC once the last view goes
+        self._arrays = {}
+        try:
+            self.buf.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def __len__(self):
+        return self.header["count"]
+
+    def section(self, name):
+        array = self._arrays.get(name)
+        if array is None:
+            info = self.header["sections"][name]
+            array = np.frombuffer(self.buf, dtype=np.dtype(info["dtype"]), count=info["count"],
+                                  offset=self._data_start + info["offset"])
+            self._arrays[name] = array
+        return array
+
+    def valid(self, name):
+        """Boolean validity mask of a column (all True when it has no nulls)"""
+        column = self.columns[name]
+        if column["type"] == "null":
+            return np.zeros(len(self), dtype=bool)
+        if "valid" not in column:
+            return np.ones(len(self), dtype=bool)
+        return np.unpackbits(self.section(column["valid"]), count=len(self), bitorder='little').astype(bool)
+
+    def dictionary(self, name):
+        """Decoded dictionary of a str/json column, in code order"""
+        column = self.columns[name]
+        offsets = self.section(column["dict_offsets"]).tolist()
+        data = bytes(self.section(column["dict_data"]))
+        words = [data[a:b].decode('utf-8') for a, b in zip(offsets, offsets[1:])]
+        return [json.loads(word) for word in words] if column["type"] == "json" else words
+
+    def array(self, name):
+        """Raw column array: values for numbers/bools, codes for str/json, None for all-null"""
+        column = self.columns[name]
+        if column["type"] == "null":
+            return None
+        return self.section(column["codes"] if "codes" in column else column["values"])
+
+    def value(self, name, index):
+        """One property value"""
+        column = self.columns[name]
+        if column["type"] == "null":
+            return None
+        if "valid" in column:
+            valid = self.section(column["valid"])
+            if not (valid[index >> 3] >> (index & 7)) & 1:
+                return None
+        if column["type"] in ("str", "json"):
+            code = int(self.section(column["codes"])[index])
+            offsets = self.section(column["dict_offsets"])
+            text = bytes(self.section(column["dict_data"])[offsets[code]:offsets[code + 1]]).decode('utf-8')
+            return text if column["type"] == "str" else json.loads(text)
+        value = self.section(column["values"])[index].item()
+        return bool(value) if column["type"] == "bool" else value
+
+    def column(self, name, rows=None):
+        """Values of one column as a list (None for nulls), optionally only at `rows`"""
+        column = self.columns[name]
+        count = len(self) if rows is None else len(rows)
+        if column["type"] == "null":
+            return [None] * count
+
+        raw = self.array(name)
+        valid = self.valid(name)
+        if rows is not None:
+            raw = raw[rows]
+            valid = valid[rows]
+
+        if column["type"] in ("str", "json"):
+            dictionary = self.dictionary(name) + [None]  # null codes point past the end
+            values = [dictionary[code] for code in np.minimum(raw.astype(np.int64), len(dictionary) - 1).tolist()]
+        else:
+            values = raw.tolist()
+            if column["type"] == "bool":
+                values = [bool(value) for value in values]
+
+        if not valid.all():
+            values = [value if ok else None for value, ok in zip(values, valid.tolist())]
+        return values
+
+
+def encode_column(sections, prefix, values):
+    """
+    Add one typed column to sections and return its header entry.
+    Types: null (no data), bool, int (narrowest signed width), float,
+    str or json (sorted dictionary + codes). Nulls go to a validity bitmap.
+    """
+    valid = np.array([value is not None for value in values], dtype=bool)
+    kinds = {type(value) for value in values if value is not None}
+    meta = {}
+    if not valid.all() and kinds:
+        meta["valid"] = sections.add(f"{prefix}.valid", np.packbits(valid, bitorder='little'))
+
+    if not kinds:
+        meta["type"] = "null"
+    elif kinds == {bool}:
+        meta["type"] = "bool"
+        meta["values"] = sections.add(f"{prefix}.values", np.array([bool(v) for v in values], dtype=np.uint8))
+    elif kinds == {int} and all(-2 ** 63 <= v < 2 ** 63 for v in values if v is not None):
+        present = [v for v in values if v is not None]
+        low, high = min(present), max(present)
+        dtype = next(t for t in _INT_TYPES if np.iinfo(t).min <= low and high <= np.iinfo(t).max)
+        meta["type"] = "int"
+        meta["values"] = sections.add(f"{prefix}.values", np.array([v or 0 for v in values], dtype=dtype))
+    elif kinds <= {int, float}:
+        meta["type"] = "float"
+        meta["values"] = sections.add(f"{prefix}.values",
+                                      np.array([np.nan if v is None else v for v in values], dtype=np.float64))
+    else:
+        meta["type"] = "str" if kinds == {str} else "json"
+        texts = [v if meta["type"] == "str" or v is None else json.dumps(v, sort_keys=True) for v in values]
+        dictionary = sorted({t for t in texts if t is not None})
+        codes_dtype = np.uint8 if len(dictionary) < 0xFF else np.uint16 if len(dictionary) < 0xFFFF else np.uint32
+        lookup = {text: i for i, text in enumerate(dictionary)}
+        null_code = _NULL_CODE[np.dtype(codes_dtype)]
+        codes = np.array([null_code if t is None else lookup[t] for t in texts], dtype=codes_dtype)
+        encoded = [text.encode('utf-8') for text in dictionary]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        meta["codes"] = sections.add(f"{prefix}.codes", codes)
+        meta["dict_offsets"] = sections.add(f"{prefix}.dict_offsets", offsets)
+        meta["dict_data"] = sections.add(f"{prefix}.dict_data", np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    return meta
+
+
+def encode_properties(sections, rows):
+    """Column header entries for a list of properties dicts (key order of first appearance)"""
+    keys = {}
+    for row in rows:
+        for key in row:
+            keys.setdefault(key, None)
+    return [dict(encode_column(sections, f"p{i}", [row.get(key) for row in rows]), name=key)
+            for i, key in enumerate(keys)]
+
+
+_OPERATORS = {
+    "==": np.equal, "!=": np.not_equal,
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+}
+
+
+class ColumnStore(MappedSections):
+    """Query interface over a .cols sidecar"""
+
+    magic = _MAGIC
+
+    @classmethod
+    def build(cls, layer, root=FEATURES_ROOT, fingerprint=None):
+        """Write the sidecar for a layer from its properties alone"""
+        path = layer_path(layer, root)
+        fingerprint = fingerprint or file_fingerprint(path)
+        rows = list(iter_properties(path))
+        sections = Sections()
+        columns = encode_properties(sections, rows)
+        write_sectioned(path + SIDECAR_SUFFIX, _MAGIC,
+                        {"count": len(rows), "columns": columns, "source": fingerprint}, sections)
+
+    @classmethod
+    def open(cls, layer, root=FEATURES_ROOT):
+        """Open a layer's store, (re)building the sidecar if it is missing or stale"""
+        return cls.open_sidecar(layer, SIDECAR_SUFFIX, root)
+
+    def mask(self, where=()):
+        """
+        Boolean row mask for a list of (column, op, value) conditions, ANDed.
+        op is one of == != < <= > >= in "not in" "is null" "not null".
+        Nulls never match a comparison.
+        """
+        result = np.ones(len(self), dtype=bool)
+        for name, op, *rest in where:
+            result &= self._condition(name, op, rest[0] if rest else None)
+        return result
+
+    def _condition(self, name, op, value):
+        if name not in self.columns:
+            return np.zeros(len(self), dtype=bool) if op != "is null" else np.ones(len(self), dtype=bool)
+        column = self.columns[name]
+        valid = self.valid(name)
+        if op == "is null":
+            return ~valid
+        if op == "not null":
+            return valid
+        if column["type"] == "null":
+            return np.zeros(len(self), dtype=bool)
+        if op in ("in", "not in") and not isinstance(value, list):
+            raise ValueError(f"'{op}' needs a JSON list, got {value!r}")
+
+        raw = self.array(name)
+        if column["type"] in ("str", "json"):
+            dictionary = self.dictionary(name)
+            if column["type"] == "json":
+                dictionary = [json.dumps(word, sort_keys=True) for word in dictionary]
+                value = [json.dumps(v, sort_keys=True) for v in value] if op in ("in", "not in") \
+                    else json.dumps(value, sort_keys=True)
+            if op in ("in", "not in"):
+                lookup = {word: code for code, word in enumerate(dictionary)}
+                codes = [lookup[v] for v in value if isinstance(v, str) and v in lookup]
+                matched = np.isin(raw, codes)
+                return valid & (matched if op == "in" else ~matched)
+            if not isinstance(value, str):
+                return self._mismatch(op, valid)
+            # The dictionary is sorted, so comparing codes compares strings
+            position = int(np.searchsorted(np.array(dictionary, dtype=object), value))
+            present = position < len(dictionary) and dictionary[position] == value
+            codes = raw.astype(np.int64)
+            if op == "==":
+                return valid & (codes == position) if present else np.zeros(len(self), dtype=bool)
+            if op == "!=":
+                return valid & (codes != position) if present else valid
+            if op in ("<", ">="):
+                return valid & _OPERATORS[op](codes, position)
+            # <= and >: a missing value sorts between position - 1 and position
+            return valid & _OPERATORS[op](codes, position if present else position - 1)
+
+        if op in ("in", "not in"):
+            matched = np.isin(raw, [v for v in value if isinstance(v, (int, float))])
+            return valid & (matched if op == "in" else ~matched)
+        if not isinstance(value, (int, float)):
+            return self._mismatch(op, valid)
+        return valid & _OPERATORS[op](raw, value)
+
+    def _mismatch(self, op, valid):
+        """Rows matching a value of another type than the column: only != holds, as in Python"""
+        return valid if op == "!=" else np.zeros(len(self), dtype=bool)
+
+    def scan(self, columns, where=(), limit=None):
+        """
+        {column: [values]} for rows matching `where`, reading only the
+        named columns plus those used in the conditions.
+        """
+        rows = np.flatnonzero(self.mask(where))
+        if limit is not None:
+            rows = rows[:limit]
+        return {name: (self.column(name, rows) if name in self.columns else [None] * len(rows)) for name in columns}
+
+    def records(self, columns, where=(), limit=None):
+        """Like scan(), but one dict per matching row"""
+        result = self.scan(columns, where, limit)
+        return [dict(zip(columns, row)) for row in zip(*(result[name] for name in columns))]
+
+
+def parse_condition(text):
+    """'scalerank <= 3' -> ('scalerank', '<=', 3); values are JSON when they parse as JSON"""
+    for op in ("not null", "is null"):
+        if text.endswith(" " + op):
+            return text[:-len(op) - 1].strip(), op
+    for op in ("not in", "in", "==", "!=", "<=", ">=", "<", ">"):
+        name, sep, value = text.partition(f" {op} ")
+        if sep:
+            value = value.strip()
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+            return name.strip(), op, value
+    raise ValueError(f"Cannot parse condition: {text}")
+
+
+if __name__ == "__main__":
+    import time
+
+    if len(sys.argv) < 3:
+        print("Usage: columnar.py <layer> <col1,col2,...> [\"col op value\" ...]")
+        sys.exit(1)
+
+    wanted = sys.argv[2].split(',')
+    conditions = [parse_condition(text) for text in sys.argv[3:]]
+    with ColumnStore.open(sys.argv[1]) as store:
+        started = time.perf_counter()
+        found = store.records(wanted, conditions)
+        elapsed = time.perf_counter() - started
+    for record in found:
+        sys.stdout.write(json.dumps(record) + '\n')
+    print(f"{len(found)} rows in {elapsed * 1000:.2f} ms", file=sys.stderr)
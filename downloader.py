@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Concurrent download engine used by data.py
+Bounded worker pool over one shared keep-alive session, with a per-host
+token bucket instead of a fixed sleep between requests. Responses are
+streamed to <file>.part and renamed into place when complete; an
+interrupted .part is resumed with a Range request on the next run.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import timing
+
+USER_AGENT = "Python-NE-Downloader"
+CHUNK_SIZE = 256 * 1024
+
+
+class DownloadCancelled(Exception):
+    """Raised inside a worker when the run is being shut down"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: refills `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop_event=None):
+        """Block until a token is available, or raise DownloadCancelled"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            if stop_event is None:
+                time.sleep(wait)
+            elif stop_event.wait(wait):
+                raise DownloadCancelled()
+
+
+class HostRateLimiter:
+    """One token bucket per host, created on first use"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url, stop_event=None):
+        host = urlsplit(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire(stop_event)
+
+
+def create_session(pool_size):
+    """Create a requests session whose connection pool fits every worker"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def format_throughput(num_bytes, seconds):
+    """Human readable MB/s figure"""
+    if seconds <= 0:
+        return "-- MB/s"
+    return f"{num_bytes / (1024 * 1024) / seconds:.2f} MB/s"
+
+
+def read_part_info(part_path, url):
+    """Validators saved next to an interrupted download, if it can be resumed"""
+    try:
+        with open(part_path + ".json") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if info.get("url") != url or not os.path.exists(part_path):
+        return None
+    # If-Range needs a strong ETag or a Last-Modified date
+    etag = info.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return info.get("last_modified")
+
+
+def write_part_info(part_path, url, etag, last_modified):
+    with open(part_path + ".json", 'w') as f:
+        json.dump({"url": url, "etag": etag, "last_modified": last_modified}, f)
+
+
+def remove_part(part_path):
+    for leftover in (part_path, part_path + ".json"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+
+def hash_existing(digest, filepath):
+    """Feed bytes already on disk into a running digest"""
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+
+def fetch_file(session, limiter, job, stop_event):
+    """
+    Stream a single job to job["path"].
+
+    job["headers"] may carry conditional request headers; a 304 reply
+    leaves the local file alone and reports status "unchanged". The body
+    goes to <path>.part in fixed-size chunks and is renamed over <path>
+    only once complete, so an interrupted run never leaves a truncated
+    file at the final path.
+    """
+    result = {"name": job["name"], "path": job["path"], "url": job["url"], "status": "failed",
+              "bytes": 0, "size": 0, "resumed_from": 0, "seconds": 0.0, "ttfb": None, "error": None,
+              "etag": None, "last_modified": None, "sha256": None}
+    part_path = job["path"] + ".part"
+    wall_start = time.time()
+    began = time.perf_counter()
+
+    try:
+        headers = dict(job.get("headers") or {})
+        validator = read_part_info(part_path, job["url"])
+        offset = os.path.getsize(part_path) if validator else 0
+        if offset:
+            # Range offsets count identity bytes, which is what the .part holds
+            headers.update({"Range": f"bytes={offset}-", "If-Range": validator,
+                            "Accept-Encoding": "identity"})
+
+        with timing.span("download.wait", file=job["name"]):
+            limiter.acquire(job["url"], stop_event)
+        start = time.perf_counter()
+
+        with session.get(job["url"], headers=headers, stream=True, timeout=60) as response:
+            # stream=True returns once the status line and headers are in
+            result["ttfb"] = time.perf_counter() - start
+            if response.status_code == 304:
+                remove_part(part_path)
+                result["seconds"] = time.perf_counter() - start
+                result["status"] = "unchanged"
+                return _finish(result, wall_start, began)
+
+            if response.status_code == 416 and offset:
+                # The .part does not fit the current upstream file: start over
+                remove_part(part_path)
+                return fetch_file(session, limiter, job, stop_event)
+
+            response.raise_for_status()
+
+            if response.status_code == 206 and response.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+                mode = 'ab'
+            else:
+                # Full body: the representation changed or the server ignored Range
+                offset = 0
+                mode = 'wb'
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            write_part_info(part_path, job["url"], etag, last_modified)
+
+            digest = hashlib.sha256()
+            if offset:
+                hash_existing(digest, part_path)
+
+            with timing.span("download.body", file=job["name"]) as body_span, open(part_path, mode) as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if stop_event.is_set():
+                        raise DownloadCancelled()
+                    f.write(chunk)
+                    digest.update(chunk)
+                    result["bytes"] += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+                body_span["bytes"] = result["bytes"]
+
+        with timing.span("download.commit", file=job["name"]):
+            os.replace(part_path, job["path"])
+            os.remove(part_path + ".json")
+
+        result["seconds"] = time.perf_counter() - start
+        result["size"] = offset + result["bytes"]
+        result["resumed_from"] = offset
+        result["sha256"] = digest.hexdigest()
+        result["etag"] = etag
+        result["last_modified"] = last_modified
+        result["status"] = "downloaded"
+    except DownloadCancelled:
+        result["status"] = "cancelled"
+    except (requests.RequestException, OSError) as e:
+        result["error"] = str(e)
+
+    return _finish(result, wall_start, began)
+
+
+def _finish(result, wall_start, began):
+    """Emit the per-file span once the outcome is known"""
+    if timing.enabled():
+        timing.emit("download.file", wall_start, time.perf_counter() - began, file=result["name"],
+                    status=result["status"], bytes=result["bytes"], resumed_from=result["resumed_from"],
+                    ttfb_ms=round(result["ttfb"] * 1000, 3) if result["ttfb"] is not None else None)
+    return result
+
+
+def run_downloads(jobs, max_workers=4, rate=2.0, burst=2):
+    """
+    Download jobs concurrently and yield one result dict per job as it finishes.
+
+    jobs: iterable of {"name": ..., "url": ..., "path": ..., "headers": {...} (optional)}
+    rate/burst: token bucket parameters applied per host (requests per second)
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+
+    max_workers = max(1, min(max_workers, len(jobs)))
+    limiter = HostRateLimiter(rate, burst)
+    stop_event = threading.Event()
+
+    with create_session(max_workers) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch_file, session, limiter, job, stop_event) for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            except BaseException:
+                # Ctrl+C or the consumer went away: let workers bail out quickly
+                stop_event.set()
+                for future in futures:
+                    future.cancel()
+                raise
@@ -2,41 +2,143 @@
 """
 Generate a simple index.html page listing all downloaded GeoJSON files
 No styling. Just links. 1994 style.
+
+Also writes gzip/brotli siblings of every file (brotli only if the
+'brotli' package is installed), optional content-hashed copies under
+dist/ for immutable caching, and manifest.json with hashes, sizes and
+feature counts. Files whose content has not changed keep their previous
+compressed output.
 """
 
+import gzip
+import json
 import os
+import shutil
 from datetime import datetime
 
+import timing
+from reader import count_features
+from sync_manifest import file_fingerprint
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def compress_file(source, target, method):
+    """Stream-compress source into target atomically; returns compressed size"""
+    tmp_path = target + ".tmp"
+    with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+        if method == "gzip":
+            with gzip.GzipFile(fileobj=dst, mode='wb', compresslevel=9, mtime=0) as gz:
+                shutil.copyfileobj(src, gz, CHUNK_SIZE)
+        else:
+            compressor = brotli.Compressor(quality=11)
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                dst.write(compressor.process(chunk))
+            dst.write(compressor.finish())
+    os.replace(tmp_path, target)
+    return os.path.getsize(target)
+
+
+def hashed_name(path, sha256):
+    """features/a/b.geojson -> dist/features/a/b.<hash12>.geojson"""
+    stem, ext = os.path.splitext(path)
+    return os.path.join("dist", f"{stem}.{sha256[:12]}{ext}")
+
+
 def generate_index_html():
     """Generate simple index.html with links to all GeoJSON files"""
-    
+
     # Configuration
     base_github_url = "https://dvanauken.github.io/data"
     features_root = "features"
-    
+    manifest_path = "manifest.json"
+    hashed_filenames = False  # True links to dist/ copies named by content hash
+
     # Check if features directory exists
     if not os.path.exists(features_root):
         print(f"ERROR: Directory '{features_root}' not found!")
         return
-    
+
+    # Previous manifest lets unchanged files skip hashing and compression
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = {entry["path"]: entry for entry in json.load(f).get("files", [])}
+
+    encodings = {"gzip": ".gz"}
+    if brotli is not None:
+        encodings["br"] = ".br"
+    else:
+        print("NOTE: brotli package not installed, skipping .br files")
+
     # Scan directory structure and collect GeoJSON files
     geojson_files = []
-    
+    manifest_files = []
+    compressed_count = 0
+
     for root, dirs, files in os.walk(features_root):
         for file in files:
             if file.endswith('.geojson'):
-                rel_path = os.path.relpath(os.path.join(root, file))
-                url_path = rel_path.replace('\\', '/')
+                rel_path = os.path.relpath(os.path.join(root, file)).replace('\\', '/')
+                old = previous.get(rel_path, {})
+                with timing.span("index.hash", file=rel_path):
+                    fingerprint = file_fingerprint(rel_path, old)
+                unchanged = old.get("sha256") == fingerprint["sha256"]
+
+                entry = {
+                    "path": rel_path,
+                    "size": fingerprint["size"],
+                    "mtime_ns": fingerprint["mtime_ns"],
+                    "sha256": fingerprint["sha256"],
+                    "features": old["features"] if unchanged and "features" in old else None,
+                    "encodings": {},
+                }
+                if entry["features"] is None:
+                    with timing.span("index.count", file=rel_path):
+                        entry["features"] = count_features(rel_path)
+
+                # Compressed siblings, reused while the content is unchanged
+                for encoding, suffix in encodings.items():
+                    target = rel_path + suffix
+                    known = old.get("encodings", {}).get(encoding)
+                    if unchanged and known and os.path.exists(target) and os.path.getsize(target) == known:
+                        entry["encodings"][encoding] = known
+                    else:
+                        with timing.span("index.compress", file=rel_path, encoding=encoding) as span:
+                            entry["encodings"][encoding] = span["bytes"] = compress_file(rel_path, target, encoding)
+                        compressed_count += 1
+
+                url_path = rel_path
+                if hashed_filenames:
+                    url_path = hashed_name(rel_path, fingerprint["sha256"]).replace('\\', '/')
+                    if old.get("hashed_path") and old["hashed_path"] != url_path:
+                        for suffix in [""] + list(encodings.values()):
+                            if os.path.exists(old["hashed_path"] + suffix):
+                                os.remove(old["hashed_path"] + suffix)
+                    if not os.path.exists(url_path):
+                        os.makedirs(os.path.dirname(url_path), exist_ok=True)
+                        for suffix in [""] + list(encodings.values()):
+                            shutil.copyfile(rel_path + suffix, url_path + suffix)
+                    entry["hashed_path"] = url_path
+
                 full_url = f"{base_github_url}/{url_path}"
-                
+                entry["url"] = full_url
+                manifest_files.append(entry)
+
                 geojson_files.append({
                     'filename': file,
                     'url': full_url
                 })
-    
+
     # Sort files alphabetically
     geojson_files.sort(key=lambda x: x['filename'])
-    
+    manifest_files.sort(key=lambda x: x['path'])
+
     # Generate simple HTML
     html = f"""<html>
 <head>
@@ -49,19 +151,26 @@ def generate_index_html():
 <hr>
 <ul>
 """
-    
+
     for file_info in geojson_files:
         html += f'<li><a href="{file_info["url"]}">{file_info["filename"]}</a></li>\n'
-    
+
     html += """</ul>
 </body>
 </html>"""
-    
+
     # Write index.html
     with open('index.html', 'w') as f:
         f.write(html)
-    
+
+    # Write manifest.json
+    with open(manifest_path, 'w') as f:
+        json.dump({"base_url": base_github_url, "files": manifest_files}, f, indent=2)
+        f.write('\n')
+
     print(f"Generated index.html with {len(geojson_files)} files")
+    print(f"Generated {manifest_path} ({compressed_count} files compressed, "
+          f"{len(manifest_files) * len(encodings) - compressed_count} reused)")
 
 if __name__ == "__main__":
-    generate_index_html()
\ No newline at end of file
+    generate_index_html()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Batch reverse geocoder over the admin polygon layers
+Answers "which country / province contains this point" for large batches
+of coordinates. Each polygon layer is prepared once into flat NumPy arrays:
+edges are bucketed by (feature, grid row), and every grid cell lists the
+buckets of the features whose bbox overlaps it. A point is then tested
+only against the edges of candidate features in its own row band, with a
+vectorized even-odd crossing test. Prepared indexes are cached under
+.cache/geocoder/, one per layer and field list, and rebuilt when the source
+file changes. Large batches are split across a process pool.
+
+    python geocoder.py < points.csv > places.csv     # lon,lat per line
+"""
+
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from reader import FEATURES_ROOT, iter_features, layer_path
+from sync_manifest import file_fingerprint
+
+# Configuration: first existing layer wins for each level
+country_layers = ["admin_0_lakes", "admin_0"]
+country_fields = ["ADMIN", "ISO_A3"]
+province_layers = ["admin_1_lakes", "admin_1"]
+province_fields = ["name", "iso_3166_2", "admin"]
+cache_root = os.path.join(".cache", "geocoder")
+cell_size = 1.0  # grid cell size in degrees
+parallel_threshold = 200000  # batches at least this big use the process pool
+
+_MAX_PAIRS = 1 << 22  # points x edges evaluated per vectorized step
+
+
+class PolygonIndex:
+    """Uniform-grid edge index over one polygon layer"""
+
+    ARRAYS = ("edges", "bucket_start", "cell_start", "cell_buckets")
+
+    def __init__(self, edges, bucket_start, cell_start, cell_buckets, bucket_feature, properties, cell_size):
+        self.edges = edges                    # (E, 4) x1, y1, x2, y2 grouped by bucket
+        self.bucket_start = bucket_start      # (B + 1) edge offsets per bucket
+        self.bucket_feature = bucket_feature  # (B) feature of each bucket
+        self.cell_start = cell_start          # (cells + 1) offsets into cell_buckets
+        self.cell_buckets = cell_buckets      # candidate buckets per cell
+        self.properties = properties
+        self.cell_size = cell_size
+        self.cols = int(round(360 / cell_size))
+        self.rows = int(round(180 / cell_size))
+
+    @classmethod
+    def build(cls, path, fields, cell_size=cell_size):
+        """Prepare a polygon layer: edges bucketed per (feature, row), candidates per cell"""
+        cols, rows = int(round(360 / cell_size)), int(round(180 / cell_size))
+        edge_parts, feature_ids, properties, boxes = [], [], [], []
+
+        for feature in iter_features(path, properties=fields):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+
+            rings = [np.asarray(ring, dtype=float)[:, :2] for polygon in polygons for ring in polygon if len(ring) > 1]
+            if not rings:
+                continue
+            index = len(properties)
+            edges = np.vstack([np.hstack([ring[:-1], ring[1:]]) for ring in rings])
+            edge_parts.append(edges)
+            feature_ids.append(np.full(len(edges), index, dtype=np.int32))
+            points = np.vstack(rings)
+            boxes.append((points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max()))
+            properties.append(feature["properties"])
+
+        if not edge_parts:
+            empty = np.zeros(1, dtype=np.int64)
+            return cls(np.zeros((0, 4)), empty, np.zeros(cols * rows + 1, dtype=np.int64),
+                       np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), properties, cell_size)
+
+        edges = np.vstack(edge_parts)
+        owners = np.concatenate(feature_ids)
+
+        # Repeat each edge once for every grid row its y-range touches
+        low = _row(np.minimum(edges[:, 1], edges[:, 3]), cell_size, rows)
+        high = _row(np.maximum(edges[:, 1], edges[:, 3]), cell_size, rows)
+        spans = high - low + 1
+        repeated = np.repeat(np.arange(len(edges)), spans)
+        edge_rows = np.repeat(low, spans) + (np.arange(len(repeated)) - np.repeat(np.cumsum(spans) - spans, spans))
+
+        order = np.lexsort((edge_rows, owners[repeated]))
+        repeated, edge_rows = repeated[order], edge_rows[order]
+        keys = owners[repeated].astype(np.int64) * rows + edge_rows
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        bucket_start = np.r_[starts, len(keys)].astype(np.int64)
+        bucket_keys = keys[starts]
+        bucket_feature = (bucket_keys // rows).astype(np.int32)
+        bucket_lookup = dict(zip(bucket_keys.tolist(), range(len(bucket_keys))))
+
+        # Candidate buckets for every cell the feature's bbox overlaps
+        cell_lists = {}
+        for index, (minx, miny, maxx, maxy) in enumerate(boxes):
+            col0, col1 = _col(np.array([minx, maxx]), cell_size, cols)
+            row0, row1 = _row(np.array([miny, maxy]), cell_size, rows)
+            for row in range(row0, row1 + 1):
+                bucket = bucket_lookup.get(index * rows + row)
+                if bucket is None:
+                    continue
+                for col in range(col0, col1 + 1):
+                    cell_lists.setdefault(row * cols + col, []).append(bucket)
+
+        counts = np.zeros(cols * rows, dtype=np.int64)
+        for cell, buckets in cell_lists.items():
+            counts[cell] = len(buckets)
+        cell_start = np.r_[0, np.cumsum(counts)].astype(np.int64)
+        cell_buckets = np.zeros(cell_start[-1], dtype=np.int32)
+        for cell, buckets in cell_lists.items():
+            cell_buckets[cell_start[cell]:cell_start[cell + 1]] = buckets
+
+        return cls(edges[repeated], bucket_start, cell_start, cell_buckets, bucket_feature, properties, cell_size)
+
+    def save(self, path, source=None, fields=None):
+        """Write the index; source (a file fingerprint) and fields let load_polygon_index validate it"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, edges=self.edges, bucket_start=self.bucket_start, bucket_feature=self.bucket_feature,
+                 cell_start=self.cell_start, cell_buckets=self.cell_buckets,
+                 properties=np.array(json.dumps(self.properties)), cell_size=np.array(self.cell_size),
+                 source=np.array(json.dumps(source)), fields=np.array(json.dumps(fields)))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_source(path):
+        """(source fingerprint, fields) stored with a cached index, without loading its arrays"""
+        with np.load(path) as data:
+            return json.loads(str(data["source"])), json.loads(str(data["fields"]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["edges"], data["bucket_start"], data["cell_start"], data["cell_buckets"],
+                       data["bucket_feature"], json.loads(str(data["properties"])), float(data["cell_size"]))
+
+    def lookup(self, lons, lats):
+        """Index of the containing feature for each point, -1 where none"""
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        result = np.full(len(lons), -1, dtype=np.int64)
+        if len(lons) == 0 or len(self.cell_buckets) == 0:
+            return result
+
+        cells = _row(lats, self.cell_size, self.rows) * self.cols + _col(lons, self.cell_size, self.cols)
+        order = np.argsort(cells, kind='stable')
+        sorted_cells = cells[order]
+        bounds = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1], True])
+
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            cell = sorted_cells[first]
+            candidates = self.cell_buckets[self.cell_start[cell]:self.cell_start[cell + 1]]
+            if len(candidates) == 0:
+                continue
+            members = order[first:last]
+            for bucket in candidates:
+                pending = members[result[members] < 0]
+                if len(pending) == 0:
+                    break
+                edges = self.edges[self.bucket_start[bucket]:self.bucket_start[bucket + 1]]
+                inside = _crossing_test(lons[pending], lats[pending], edges)
+                result[pending[inside]] = self.bucket_feature[bucket]
+        return result
+
+
+def _col(lons, size, cols):
+    return np.clip(((np.asarray(lons) + 180.0) // size).astype(np.int64), 0, cols - 1)
+
+
+def _row(lats, size, rows):
+    return np.clip(((np.asarray(lats) + 90.0) // size).astype(np.int64), 0, rows - 1)
+
+
+def _crossing_test(xs, ys, edges):
+    """Even-odd rule: True where a ray from (x, y) towards +x crosses the edges an odd number of times"""
+    x1, y1, x2, y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+    inside = np.zeros(len(xs), dtype=bool)
+    step = max(1, _MAX_PAIRS // max(1, len(edges)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for first in range(0, len(xs), step):
+            px = xs[first:first + step, None]
+            py = ys[first:first + step, None]
+            spans = (y1 > py) != (y2 > py)
+            x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+            inside[first:first + step] = np.count_nonzero(spans & (px < x_cross), axis=1) % 2 == 1
+    return inside
+
+
+def load_polygon_index(layer, fields, root=FEATURES_ROOT, size=None):
+    """Prepared index for a layer, from the on-disk cache when the source and fields are unchanged"""
+    size = size or cell_size
+    fields = list(fields)
+    path = layer_path(layer, root)
+    name = os.path.basename(path)[:-len('.geojson')]
+    digest = hashlib.sha256(json.dumps(fields).encode()).hexdigest()[:12]
+    cached = os.path.join(cache_root, f"{name}-{digest}-{size:g}.npz")
+
+    previous = None
+    try:
+        previous, cached_fields = PolygonIndex.read_source(cached)
+    except (OSError, KeyError, ValueError):
+        cached_fields = None
+    # An unchanged size and mtime reuse the stored hash instead of rereading the file
+    fingerprint = file_fingerprint(path, previous)
+    if previous == fingerprint and cached_fields == fields:
+        return PolygonIndex.load(cached), cached
+
+    index = PolygonIndex.build(path, fields, size)
+    index.save(cached, fingerprint, fields)
+    return index, cached
+
+
+def _first_layer(candidates, root):
+    for layer in candidates:
+        try:
+            return layer_path(layer, root)
+        except FileNotFoundError:
+            continue
+    return None
+
+
+_worker_indexes = None
+
+
+def _init_worker(paths):
+    global _worker_indexes
+    _worker_indexes = [PolygonIndex.load(path) if path else None for path in paths]
+
+
+def _lookup_chunk(lons, lats):
+    return [index.lookup(lons, lats) if index else np.full(len(lons), -1) for index in _worker_indexes]
+
+
+class ReverseGeocoder:
+    """Country and province lookup for batches of lon/lat points"""
+
+    def __init__(self, root=FEATURES_ROOT):
+        self.indexes = []
+        self.cache_paths = []
+        for candidates, fields in ((country_layers, country_fields), (province_layers, province_fields)):
+            layer = _first_layer(candidates, root)
+            if layer is None:
+                self.indexes.append(None)
+                self.cache_paths.append(None)
+                continue
+            index, cached = load_polygon_index(layer, fields, root)
+            self.indexes.append(index)
+            self.cache_paths.append(cached)
+
+    def lookup(self, lons, lats, workers=None):
+        """(country_ids, province_ids): feature indexes per point, -1 where nothing matched"""
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        if len(lons) < parallel_threshold or workers == 1:
+            return tuple(_lookup_with(index, lons, lats) for index in self.indexes)
+
+        workers = workers or os.cpu_count() or 1
+        chunks = np.array_split(np.arange(len(lons)), workers * 4)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self.cache_paths,)) as executor:
+            parts = list(executor.map(_lookup_chunk, [lons[c] for c in chunks], [lats[c] for c in chunks]))
+        return tuple(np.concatenate([part[level] for part in parts]) for level in range(len(self.indexes)))
+
+    def reverse_geocode(self, lons, lats, workers=None):
+        """One {"country": {...}, "province": {...}} dict per point (None where not found)"""
+        country_ids, province_ids = self.lookup(lons, lats, workers)
+        countries, provinces = (index.properties if index else [] for index in self.indexes)
+        return [{"country": countries[c] if c >= 0 else None, "province": provinces[p] if p >= 0 else None}
+                for c, p in zip(country_ids.tolist(), province_ids.tolist())]
+
+
+def _lookup_with(index, lons, lats):
+    return index.lookup(lons, lats) if index else np.full(len(lons), -1, dtype=np.int64)
+
+
+if __name__ == "__main__":
+    import time
+
+    points = np.loadtxt(sys.stdin, delimiter=',', ndmin=2)
+    started = time.perf_counter()
+    geocoder = ReverseGeocoder()
+    if all(index is None for index in geocoder.indexes):
+        print("ERROR: no admin polygon layers found; run data.py first", file=sys.stderr)
+        sys.exit(1)
+    prepared = time.perf_counter()
+    places = geocoder.reverse_geocode(points[:, 0], points[:, 1])
+    finished = time.perf_counter()
+
+    for (lon, lat), place in zip(points.tolist(), places):
+        country = place["country"] or {}
+        province = place["province"] or {}
+        values = [country.get(country_fields[0]), country.get(country_fields[1]),
+                  province.get(province_fields[0]), province.get(province_fields[1])]
+        sys.stdout.write(f"{lon},{lat}," + ",".join('' if v is None else str(v) for v in values) + '\n')
+    print(f"{len(points)} points: prepare {prepared - started:.2f}s, "
+          f"lookup {finished - prepared:.2f}s ({len(points) / max(finished - prepared, 1e-9):.0f} points/s)",
+          file=sys.stderr)
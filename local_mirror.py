@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the Natural Earth geojson folder
+Serves the committed features/ tree under the upstream source filenames
+from data.py, so the downloader can be exercised offline:
+
+    python local_mirror.py 8000
+    NE_BASE_URL=http://127.0.0.1:8000/ python data.py
+"""
+
+import os
+import sys
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from data import GEOJSON_FILES
+
+
+def build_routes(root="."):
+    """Map '/<source filename>' to the local file it was saved as"""
+    routes = {}
+    for filename, config in GEOJSON_FILES.items():
+        filepath = os.path.join(root, config["directory"], config["save_as"])
+        if os.path.exists(filepath):
+            routes["/" + filename] = filepath
+    return routes
+
+
+def not_modified(headers, etag, mtime):
+    """Evaluate If-None-Match, then If-Modified-Since, against request headers"""
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')]
+
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def requested_range(headers, size, etag, last_modified):
+    """(start, end) for a single satisfiable Range, "unsatisfiable", or None"""
+    header = headers.get("Range", "")
+    if not header.startswith("bytes=") or ',' in header:
+        return None
+
+    if_range = headers.get("If-Range")
+    if if_range and if_range not in (etag, last_modified):
+        return None
+
+    first, _, last = header[len("bytes="):].partition('-')
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    """Serve files from the route table; everything else is a 404"""
+
+    routes = {}
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.send_file(head_only=True)
+
+    def do_GET(self):
+        self.send_file()
+
+    def send_file(self, head_only=False):
+        filepath = self.routes.get(self.path.split('?', 1)[0])
+        if filepath is None:
+            self.send_error(404, "Not in mirror")
+            return
+
+        stat = os.stat(filepath)
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        if not_modified(self.headers, etag, stat.st_mtime):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            return
+
+        byte_range = requested_range(self.headers, size, etag, last_modified)
+        if byte_range == "unsatisfiable":
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, size - 1)
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", "application/geo+json")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+
+        if not head_only:
+            with open(filepath, 'rb') as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = f.read(min(64 * 1024, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_mirror(port=0, root="."):
+    """Create (but do not start) a mirror server bound to localhost"""
+    handler = type("BoundMirrorHandler", (MirrorHandler,), {"routes": build_routes(root)})
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def start_mirror(port=0, root="."):
+    """Start the mirror on a background thread; returns (server, base_url)"""
+    server = make_mirror(port, root)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    server = make_mirror(port)
+    print(f"Serving {len(server.RequestHandlerClass.routes)} files at http://127.0.0.1:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Nearest-neighbour and code lookups on point layers (airports, ports)
+A <layer>.geojson.points sidecar holds the points as unit-sphere xyz
+vectors, arranged as an implicit k-d tree (each range's median is its
+split node), next to the typed property columns from columnar.py. Chord
+distance on the unit sphere orders points the same way great-circle distance
+does, so k-nearest and radius queries need no special case at the poles or
+the antimeridian. Code fields (iata_code, gps_code, abbrev) are hashed into
+dicts when the sidecar is opened. Single queries go through an LRU cache.
+
+    python point_index.py ne_10m_airports nearest -0.45 51.47 [k]
+    python point_index.py ne_10m_airports radius -0.45 51.47 100
+    python point_index.py ne_10m_airports code LHR
+"""
+
+import heapq
+import math
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from columnar import MappedSections, Sections, encode_properties, write_sectioned
+from reader import FEATURES_ROOT, iter_features, layer_path
+from sync_manifest import file_fingerprint
+
+SIDECAR_SUFFIX = ".points"
+LEAF_SIZE = 16
+EARTH_RADIUS_KM = 6371.0088
+CODE_FIELDS = ["iata_code", "gps_code", "abbrev"]
+
+# Configuration
+cache_size = 4096  # cached query results per open index
+
+_MAGIC = b"NEPNTS\x00\x01"
+
+
+def to_unit_xyz(lons, lats):
+    """(n, 3) unit vectors for lon/lat degrees"""
+    lon = np.radians(np.asarray(lons, dtype=float))
+    lat = np.radians(np.asarray(lats, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+def km_to_chord(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def build_kdtree(xyz, leaf_size=LEAF_SIZE):
+    """(order, split_dims): point order forming an implicit k-d tree, and the split axis at each median"""
+    order = np.arange(len(xyz))
+    split_dims = np.zeros(len(xyz), dtype=np.uint8)
+    stack = [(0, len(xyz))]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo <= leaf_size:
+            continue
+        pts = xyz[order[lo:hi]]
+        dim = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        mid = (lo + hi) // 2
+        order[lo:hi] = order[lo:hi][np.argpartition(pts[:, dim], mid - lo)]
+        split_dims[mid] = dim
+        stack.append((lo, mid))
+        stack.append((mid + 1, hi))
+    return order, split_dims
+
+
+class PointIndex(MappedSections):
+    """k-d tree, code lookups and property columns of one point layer"""
+
+    magic = _MAGIC
+
+    @classmethod
+    def build(cls, layer, root=FEATURES_ROOT, fingerprint=None):
+        """Write the sidecar for a point layer (MultiPoints use their first point)"""
+        path = layer_path(layer, root)
+        fingerprint = fingerprint or file_fingerprint(path)
+        rows, features, coords = [], [], []
+        for index, feature in enumerate(iter_features(path)):
+            rows.append(feature.get("properties") or {})
+            geometry = feature.get("geometry") or {}
+            point = geometry.get("coordinates")
+            if geometry.get("type") == "MultiPoint":
+                point = point[0] if point else None
+            if geometry.get("type") in ("Point", "MultiPoint") and point:
+                features.append(index)
+                coords.append(point[:2])
+
+        coords = np.array(coords, dtype=float).reshape(-1, 2)
+        xyz = to_unit_xyz(coords[:, 0], coords[:, 1])
+        order, split_dims = build_kdtree(xyz)
+
+        sections = Sections()
+        sections.add("tree_xyz", xyz[order].ravel())
+        sections.add("tree_features", np.array(features, dtype=np.uint32)[order])
+        sections.add("tree_split", split_dims)
+        sections.add("tree_lonlat", coords[order].ravel())
+        columns = encode_properties(sections, rows)
+        write_sectioned(path + SIDECAR_SUFFIX, _MAGIC,
+                        {"count": len(rows), "points": len(features), "leaf_size": LEAF_SIZE,
+                         "columns": columns, "source": fingerprint}, sections)
+
+    @classmethod
+    def open(cls, layer, root=FEATURES_ROOT):
+        """Open a layer's index, (re)building the sidecar if it is missing or stale"""
+        return cls.open_sidecar(layer, SIDECAR_SUFFIX, root)
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.xyz = self.section("tree_xyz").reshape(-1, 3)
+        self.tree_features = self.section("tree_features")
+        self.split_dims = self.section("tree_split")
+        self.leaf_size = self.header["leaf_size"]
+        self.codes = {}
+        for field in CODE_FIELDS:
+            if field in self.columns and self.columns[field]["type"] == "str":
+                table = {}
+                for index, code in enumerate(self.column(field)):
+                    if code:
+                        table.setdefault(code.strip().upper(), []).append(index)
+                self.codes[field] = table
+        self._cached_search = lru_cache(maxsize=cache_size)(self._search)
+
+    def close(self):
+        self.xyz = self.tree_features = self.split_dims = None
+        super().close()
+
+    def _search(self, lon, lat, k, radius_km):
+        """Tuple of (feature index, km) pairs, nearest first"""
+        query = to_unit_xyz(lon, lat)
+        limit = km_to_chord(radius_km) ** 2 if radius_km is not None else math.inf
+        best = []  # max-heap of (-squared chord, tree position)
+        xyz, split_dims, leaf_size = self.xyz, self.split_dims, self.leaf_size
+
+        # Depth-first, near side first; a far side is skipped once the split
+        # plane is further away than the current k-th best (or the radius)
+        stack = [(0, len(xyz), 0.0)] if len(xyz) and k != 0 else []
+        while stack:
+            lo, hi, plane_d2 = stack.pop()
+            bound = min(limit, -best[0][0]) if k is not None and len(best) >= k else limit
+            if plane_d2 > bound:
+                continue
+            if hi - lo <= leaf_size:
+                first, last = lo, hi
+            else:
+                mid = (lo + hi) // 2
+                diff = query[split_dims[mid]] - xyz[mid, split_dims[mid]]
+                near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+                stack.append((far[0], far[1], diff * diff))
+                stack.append((near[0], near[1], 0.0))
+                first, last = mid, mid + 1
+
+            d2 = ((xyz[first:last] - query) ** 2).sum(axis=1)
+            for position in np.flatnonzero(d2 <= bound).tolist():
+                item = (-d2[position], first + position)
+                if k is None or len(best) < k:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+        hits = sorted(best, reverse=True)
+        distances = chord_to_km(np.sqrt([-d2 for d2, _ in hits]))
+        return tuple((int(self.tree_features[position]), float(km))
+                     for (_, position), km in zip(hits, distances))
+
+    def nearest(self, lon, lat, k=1, radius_km=None):
+        """The k nearest features as [(feature index, km)], optionally within radius_km"""
+        return list(self._cached_search(float(lon), float(lat), k, radius_km))
+
+    def within(self, lon, lat, radius_km):
+        """Every feature within radius_km as [(feature index, km)], nearest first"""
+        return list(self._cached_search(float(lon), float(lat), None, radius_km))
+
+    def nearest_many(self, lons, lats, k=1, radius_km=None):
+        """Bulk nearest(); repeated coordinates are answered once"""
+        lonlat = np.stack([np.asarray(lons, dtype=float), np.asarray(lats, dtype=float)], axis=1)
+        unique, inverse = np.unique(lonlat, axis=0, return_inverse=True)
+        answers = [self.nearest(lon, lat, k, radius_km) for lon, lat in unique.tolist()]
+        return [answers[i] for i in inverse.ravel().tolist()]
+
+    def by_code(self, code, fields=None):
+        """Feature indexes whose code fields match, case-insensitively"""
+        code = code.strip().upper()
+        found = []
+        for field in fields or CODE_FIELDS:
+            for index in self.codes.get(field, {}).get(code, []):
+                if index not in found:
+                    found.append(index)
+        return found
+
+    def by_codes(self, codes, fields=None):
+        """Bulk by_code(): {code: [feature indexes]}"""
+        return {code: self.by_code(code, fields) for code in codes}
+
+    def properties(self, index, names=None):
+        return {name: self.value(name, index) for name in (names or self.columns)}
+
+    def cache_info(self):
+        return self._cached_search.cache_info()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: python point_index.py <layer> nearest <lon> <lat> [k] | "
+              "radius <lon> <lat> <km> | code <code>")
+        sys.exit(1)
+
+    layer, command = sys.argv[1], sys.argv[2]
+    with PointIndex.open(layer) as index:
+        if command == "code":
+            hits = [(i, None) for i in index.by_code(sys.argv[3])]
+        elif command == "radius":
+            hits = index.within(float(sys.argv[3]), float(sys.argv[4]), float(sys.argv[5]))
+        else:
+            k = int(sys.argv[5]) if len(sys.argv) > 5 else 1
+            hits = index.nearest(float(sys.argv[3]), float(sys.argv[4]), k)
+
+        names = [name for name in ["name", "iata_code", "gps_code", "type"] if name in index.columns]
+        for feature, km in hits:
+            distance = f"{km:9.1f} km  " if km is not None else ""
+            print(f"{distance}{index.properties(feature, names)}")
+        print(f"{len(hits)} results")
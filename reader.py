@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Streaming GeoJSON feature reader for the features/ tree
+Memory-maps a FeatureCollection and yields one feature at a time. The
+features array is decoded a window at a time, each feature in a single
+JSONDecoder.raw_decode call, so memory stays flat (one window plus one
+feature) while throughput stays close to json.load.
+
+    python reader.py ne_10m_airports --zoom 4 --properties name,iata_code
+"""
+
+import codecs
+import json
+import mmap
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+FEATURES_ROOT = "features"
+
+_STRUCTURE = re.compile(rb'["{}\[\]]')
+_BRACES = re.compile(rb'["{}]')
+_STRING_END = re.compile(rb'["\\]')
+_ARRAY_OPEN = re.compile(rb'\s*:\s*\[')
+_NEXT_ITEM = re.compile(rb'[\s,]*')
+_NEXT_ITEM_TEXT = re.compile(r'[\s,]*')
+_DECODER = json.JSONDecoder()
+WINDOW_SIZE = 4 * 1024 * 1024  # bytes of the features array decoded to text at a time
+
+
+def list_layers(root=FEATURES_ROOT):
+    """Map layer name (file name without .geojson) to its path under root"""
+    layers = {}
+    for dirpath, dirs, files in os.walk(root):
+        dirs.sort()
+        for file in sorted(files):
+            if file.endswith('.geojson'):
+                layers.setdefault(file[:-len('.geojson')], os.path.join(dirpath, file))
+    return layers
+
+
+def layer_path(layer, root=FEATURES_ROOT):
+    """Accept a path or a bare layer name such as 'ne_10m_airports'"""
+    if os.path.exists(layer):
+        return layer
+    path = list_layers(root).get(layer)
+    if path is None:
+        raise FileNotFoundError(f"No layer named '{layer}' under {root}/")
+    return path
+
+
+@contextmanager
+def open_mapped(path):
+    """Read-only memory map of a file (b'' for an empty file)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
+def _skip_string(buf, pos):
+    """pos is just past an opening quote; return the index past the closing one"""
+    while True:
+        match = _STRING_END.search(buf, pos)
+        if match is None:
+            raise ValueError("Unterminated string in GeoJSON")
+        if buf[match.start()] == 0x5c:  # backslash escapes the next byte
+            pos = match.start() + 2
+            continue
+        return match.end()
+
+
+def _match_close(buf, start):
+    """start is an opening '{'; return the index past its matching '}'"""
+    depth = 0
+    pos = start
+    while True:
+        match = _BRACES.search(buf, pos)
+        if match is None:
+            raise ValueError("Unterminated object in GeoJSON")
+        ch = buf[match.start()]
+        if ch == 0x22:
+            pos = _skip_string(buf, match.end())
+            continue
+        depth += 1 if ch == 0x7b else -1
+        pos = match.end()
+        if depth == 0:
+            return pos
+
+
+def _find_member(buf, start, end, key, opener):
+    """
+    Locate a member of the object spanning buf[start:end] whose value starts
+    with `opener` (a compiled ':\\s*[' or ':\\s*{' pattern). Returns the
+    index of the value's opening bracket, or None.
+    """
+    depth = 0
+    pos = start
+    quoted = b'"' + key + b'"'
+    while pos < end:
+        match = _STRUCTURE.search(buf, pos, end)
+        if match is None:
+            return None
+        ch = buf[match.start()]
+        if ch == 0x22:
+            string_end = _skip_string(buf, match.end())
+            if depth == 1 and buf[match.start():string_end] == quoted:
+                value = opener.match(buf, string_end)
+                if value:
+                    return value.end() - 1
+            pos = string_end
+            continue
+        depth += 1 if ch in (0x7b, 0x5b) else -1
+        pos = match.end()
+    return None
+
+
+def iter_feature_spans(buf):
+    """Yield (start, end) byte offsets of each feature in a FeatureCollection"""
+    array_start = _find_member(buf, 0, len(buf), b'features', _ARRAY_OPEN)
+    if array_start is None:
+        return
+
+    pos = array_start + 1
+    while True:
+        pos = _NEXT_ITEM.match(buf, pos).end()
+        if pos >= len(buf) or buf[pos] == 0x5d:  # ']'
+            return
+        if buf[pos] != 0x7b:
+            raise ValueError(f"Expected a feature object at byte {pos}")
+        end = _match_close(buf, pos)
+        yield pos, end
+        pos = end
+
+
+def iter_decoded(buf, with_offsets=False):
+    """
+    Yield (start, end, feature) for each feature of a FeatureCollection,
+    decoding every feature exactly once. start/end are byte offsets when
+    with_offsets is set, otherwise None.
+    """
+    array_start = _find_member(buf, 0, len(buf), b'features', _ARRAY_OPEN)
+    if array_start is None:
+        return
+
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    read_pos = array_start + 1
+    text = ''
+    i = 0
+    mark, mark_byte = 0, read_pos  # text[mark] sits at byte mark_byte
+
+    while True:
+        i = _NEXT_ITEM_TEXT.match(text, i).end()
+        if i < len(text) and text[i] == ']':
+            return
+        if i < len(text) and text[i] != '{':
+            raise ValueError("Expected a feature object in the features array")
+        if i < len(text):
+            try:
+                feature, end = _DECODER.raw_decode(text, i)
+            except json.JSONDecodeError:
+                if read_pos >= len(buf):
+                    raise
+                end = None  # the feature runs past the window
+            if end is not None:
+                if with_offsets:
+                    start_byte = mark_byte + len(text[mark:i].encode('utf-8'))
+                    mark_byte = start_byte + len(text[i:end].encode('utf-8'))
+                    mark = end
+                    yield start_byte, mark_byte, feature
+                else:
+                    yield None, None, feature
+                i = end
+                continue
+        elif read_pos >= len(buf):
+            return
+
+        # Drop decoded text and append the next window
+        if with_offsets:
+            mark_byte += len(text[mark:i].encode('utf-8'))
+        text, mark = text[i:], 0
+        i = 0
+        chunk = buf[read_pos:read_pos + WINDOW_SIZE]
+        read_pos += len(chunk)
+        text += utf8.decode(chunk, final=read_pos >= len(buf))
+
+
+def get_property(properties, name):
+    """Look a property up by name, falling back to the upper-case spelling
+    used by some Natural Earth layers (SCALERANK, MIN_ZOOM, ...)"""
+    if name in properties:
+        return properties[name]
+    return properties.get(name.upper())
+
+
+def make_filter(where=None, zoom=None, max_scalerank=None):
+    """
+    Build a predicate over a properties dict, or None when nothing filters.
+
+    where: {field: value or callable(value) -> bool}
+    zoom: keep features whose min_zoom <= zoom
+    max_scalerank: keep features whose scalerank <= max_scalerank
+    Features without min_zoom/scalerank are kept by the zoom/scalerank tests.
+    """
+    tests = []
+    for field, expected in (where or {}).items():
+        if callable(expected):
+            tests.append(lambda p, f=field, t=expected: t(get_property(p, f)))
+        else:
+            tests.append(lambda p, f=field, v=expected: get_property(p, f) == v)
+    if zoom is not None:
+        tests.append(lambda p: get_property(p, "min_zoom") is None or get_property(p, "min_zoom") <= zoom)
+    if max_scalerank is not None:
+        tests.append(lambda p: get_property(p, "scalerank") is None or get_property(p, "scalerank") <= max_scalerank)
+
+    if not tests:
+        return None
+    return lambda properties: all(test(properties) for test in tests)
+
+
+def project(properties, names):
+    """Keep only the requested properties (names match either case)"""
+    wanted = set(names) | {name.upper() for name in names}
+    return {key: value for key, value in properties.items() if key in wanted}
+
+
+def _finish_feature(feature, properties=None, predicate=None):
+    if predicate is not None and not predicate(feature.get("properties") or {}):
+        return None
+    if properties is not None:
+        feature["properties"] = project(feature.get("properties") or {}, properties)
+    return feature
+
+
+def geometry_bbox(geometry):
+    """[minx, miny, maxx, maxy] of any GeoJSON geometry, or None if empty"""
+    xs = []
+    ys = []
+
+    def walk(coords):
+        if coords and isinstance(coords[0], (int, float)):
+            xs.append(coords[0])
+            ys.append(coords[1])
+        else:
+            for item in coords:
+                walk(item)
+
+    if geometry:
+        if geometry.get("type") == "GeometryCollection":
+            for part in geometry.get("geometries", []):
+                bbox = geometry_bbox(part)
+                if bbox:
+                    xs.extend((bbox[0], bbox[2]))
+                    ys.extend((bbox[1], bbox[3]))
+        else:
+            walk(geometry.get("coordinates") or [])
+    if not xs:
+        return None
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def feature_bbox(buf, start, end):
+    """
+    Bounding box of the feature at buf[start:end]. Natural Earth writes a
+    "bbox" member on every feature, which is read without touching the
+    geometry; otherwise the geometry is decoded and measured.
+    """
+    bbox_start = _find_member(buf, start, end, b'bbox', _ARRAY_OPEN)
+    if bbox_start is not None:
+        bbox = json.loads(buf[bbox_start:buf.find(b']', bbox_start) + 1])
+        if len(bbox) == 4:
+            return bbox
+        if len(bbox) == 6:  # 3D bbox
+            return [bbox[0], bbox[1], bbox[3], bbox[4]]
+    return geometry_bbox(json.loads(buf[start:end]).get("geometry"))
+
+
+def iter_features(layer, properties=None, where=None, zoom=None, max_scalerank=None,
+                  with_offsets=False, root=FEATURES_ROOT):
+    """
+    Yield features from a layer one at a time.
+
+    layer: path to a .geojson file or a layer name under root
+    properties: iterable of property names to keep (None keeps all)
+    where/zoom/max_scalerank: see make_filter
+    with_offsets: yield (start, end, feature) with byte offsets into the file
+    """
+    predicate = make_filter(where, zoom, max_scalerank)
+    names = list(properties) if properties is not None else None
+
+    with open_mapped(layer_path(layer, root)) as buf:
+        for start, end, feature in iter_decoded(buf, with_offsets):
+            feature = _finish_feature(feature, names, predicate)
+            if feature is None:
+                continue
+            yield (start, end, feature) if with_offsets else feature
+
+
+def iter_properties(layer, root=FEATURES_ROOT):
+    """Yield each feature's properties dict"""
+    with open_mapped(layer_path(layer, root)) as buf:
+        for _, _, feature in iter_decoded(buf):
+            yield feature.get("properties") or {}
+
+
+def count_features(layer, root=FEATURES_ROOT):
+    """Count features without decoding any of them"""
+    with open_mapped(layer_path(layer, root)) as buf:
+        return sum(1 for _ in iter_feature_spans(buf))
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Stream features from a layer under features/")
+    parser.add_argument("layer", help="layer name or path to a .geojson file")
+    parser.add_argument("--properties", help="comma separated property names to keep")
+    parser.add_argument("--zoom", type=float, help="keep features with min_zoom <= ZOOM")
+    parser.add_argument("--max-scalerank", type=float, help="keep features with scalerank <= N")
+    parser.add_argument("--count", action="store_true", help="only report counts and speed")
+    args = parser.parse_args()
+
+    names = args.properties.split(',') if args.properties else None
+    started = time.perf_counter()
+    count = 0
+    for feature in iter_features(args.layer, names, zoom=args.zoom, max_scalerank=args.max_scalerank):
+        count += 1
+        if not args.count:
+            sys.stdout.write(json.dumps(feature) + '\n')
+    elapsed = time.perf_counter() - started
+    print(f"{count} features in {elapsed:.3f}s ({count / elapsed if elapsed else 0:.0f} features/s)", file=sys.stderr)
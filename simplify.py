@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Write level-of-detail variants of every line and polygon layer
+Each layer is split into arcs at topological junctions (vertices where
+the neighbouring geometry differs, as in TopoJSON). Every arc is
+simplified with a NumPy Douglas-Peucker pass, always in the same
+direction, so a border shared by two features comes out the same in both.
+Tolerances follow the size of a pixel at each zoom.
+
+Output: lod/<layer>/z<zoom>.geojson
+"""
+
+import json
+import os
+
+import numpy as np
+
+from reader import FEATURES_ROOT, iter_features, list_layers
+from sync_manifest import file_fingerprint
+from tiles import load_source_state
+
+# Configuration
+lod_root = "lod"
+lod_zooms = [0, 2, 4, 6]
+pixel_tolerance = 0.5  # Douglas-Peucker tolerance, in 256px-tile pixels at each zoom
+coordinate_precision = 6
+
+
+def zoom_tolerance(z, pixels=pixel_tolerance):
+    """Tolerance in degrees: `pixels` pixels of a 256px tile at zoom z"""
+    return pixels * 360.0 / (256 * 2 ** z)
+
+
+def douglas_peucker(points, tolerance):
+    """Boolean mask of the vertices of points (n, 2) kept by Douglas-Peucker"""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        a = points[first]
+        inner = points[first + 1:last] - a
+        chord = points[last] - a
+        length = np.hypot(chord[0], chord[1])
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(chord[0] * inner[:, 1] - chord[1] * inner[:, 0]) / length
+        k = int(np.argmax(distances))
+        if distances[k] > tolerance:
+            split = first + 1 + k
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def find_junctions(lines, closed):
+    """
+    Per-line boolean masks marking junction vertices: ends of open lines and
+    any vertex whose (unordered) pair of neighbours differs between its
+    occurrences. For closed rings the repeated last vertex is not included.
+    """
+    points, lows, highs = [], [], []
+    for line, is_closed in zip(lines, closed):
+        pts = line[:-1] if is_closed else line
+        if is_closed:
+            prev, nxt = np.roll(pts, 1, axis=0), np.roll(pts, -1, axis=0)
+        else:
+            missing = np.full((1, 2), np.inf)
+            prev = np.vstack([missing, pts[:-1]])
+            nxt = np.vstack([pts[1:], missing])
+        # Order each neighbour pair so direction of travel does not matter
+        swap = (prev[:, 0] > nxt[:, 0]) | ((prev[:, 0] == nxt[:, 0]) & (prev[:, 1] > nxt[:, 1]))
+        low = np.where(swap[:, None], nxt, prev)
+        high = np.where(swap[:, None], prev, nxt)
+        points.append(pts)
+        lows.append(low)
+        highs.append(high)
+
+    if not points:
+        return []
+    pts = np.vstack(points)
+    rows = np.hstack([pts, np.vstack(lows), np.vstack(highs)])
+    _, point_ids = np.unique(pts, axis=0, return_inverse=True)
+    _, key_ids = np.unique(rows, axis=0, return_inverse=True)
+    point_ids = point_ids.ravel()
+    pairs = np.unique(np.stack([point_ids, key_ids.ravel()], axis=1), axis=0)
+    is_junction = np.bincount(pairs[:, 0], minlength=point_ids.max() + 1) > 1
+
+    masks = []
+    offset = 0
+    for line, is_closed in zip(lines, closed):
+        count = len(line) - 1 if is_closed else len(line)
+        mask = is_junction[point_ids[offset:offset + count]]
+        if not is_closed:
+            mask[0] = mask[-1] = True
+        masks.append(mask)
+        offset += count
+    return masks
+
+
+def _simplify_arc(arc, tolerance):
+    """Douglas-Peucker in a canonical direction, so shared arcs match"""
+    first, last = tuple(arc[0]), tuple(arc[-1])
+    if first == last and len(arc) > 2:
+        first, last = tuple(arc[1]), tuple(arc[-2])
+    if first > last:
+        return arc[::-1][douglas_peucker(arc[::-1], tolerance)][::-1]
+    return arc[douglas_peucker(arc, tolerance)]
+
+
+def split_at_junctions(line, is_closed, junctions):
+    """
+    Cut a line or closed ring into arcs between junction vertices. Arcs share
+    their end vertices; a ring without junctions is returned as one closed arc.
+    """
+    cuts = np.flatnonzero(junctions)
+    if not is_closed:
+        return [line[a:b + 1] for a, b in zip(cuts, cuts[1:])]
+
+    if len(cuts) == 0:
+        # Start a junction-free ring on its smallest vertex, so every copy of a
+        # shared ring (an enclave and the hole it fills) is cut the same way
+        ring = line[:-1]
+        first = np.lexsort((ring[:, 1], ring[:, 0]))[0]
+        ring = np.roll(ring, -first, axis=0)
+        return [np.vstack([ring, ring[:1]])]
+
+    # Start the ring on a junction so no arc is cut at an arbitrary vertex
+    ring = np.roll(line[:-1], -cuts[0], axis=0)
+    cuts = np.append(cuts - cuts[0], len(ring))
+    ring = np.vstack([ring, ring[:1]])
+    return [ring[a:b + 1] for a, b in zip(cuts, cuts[1:])]
+
+
+def simplify_line(line, is_closed, junctions, tolerance):
+    """Simplify one line or ring, keeping its junction vertices fixed"""
+    pieces = [_simplify_arc(arc, tolerance) for arc in split_at_junctions(line, is_closed, junctions)]
+    return np.vstack([pieces[0]] + [piece[1:] for piece in pieces[1:]])
+
+
+class LayerGeometry:
+    """A layer's features with every line/ring pulled out into NumPy arrays"""
+
+    def __init__(self, features):
+        self.features = features
+        self.lines = []
+        self.closed = []
+        self.templates = [self._extract(feature.get("geometry")) for feature in features]
+        self.junctions = find_junctions(self.lines, self.closed)
+
+    def _add(self, coords, is_closed):
+        self.lines.append(np.asarray(coords, dtype=float)[:, :2])
+        self.closed.append(is_closed)
+        return len(self.lines) - 1
+
+    def _extract(self, geometry):
+        if not geometry:
+            return None
+        kind = geometry["type"]
+        coords = geometry.get("coordinates")
+        if kind == "LineString":
+            return kind, self._add(coords, False)
+        if kind == "MultiLineString":
+            return kind, [self._add(line, False) for line in coords]
+        if kind == "Polygon":
+            return kind, [self._add(ring, True) for ring in coords]
+        if kind == "MultiPolygon":
+            return kind, [[self._add(ring, True) for ring in polygon] for polygon in coords]
+        return None  # points and collections pass through untouched
+
+    @property
+    def vertex_count(self):
+        return sum(len(line) for line in self.lines)
+
+    def simplified(self, tolerance, digits=coordinate_precision):
+        """(features, vertex count) at one tolerance"""
+        lines = [
+            np.round(simplify_line(line, is_closed, junctions, tolerance), digits)
+            for line, is_closed, junctions in zip(self.lines, self.closed, self.junctions)
+        ]
+
+        def ring(i):
+            return lines[i].tolist() if len(lines[i]) >= 4 else None
+
+        def polygon(rings):
+            outer = ring(rings[0])
+            if outer is None:
+                return None
+            return [outer] + [r for r in map(ring, rings[1:]) if r]
+
+        features = []
+        vertices = 0
+        for feature, template in zip(self.features, self.templates):
+            geometry = feature.get("geometry")
+            if template is not None:
+                kind, refs = template
+                if kind == "LineString":
+                    geometry = {"type": kind, "coordinates": lines[refs].tolist()}
+                elif kind == "MultiLineString":
+                    geometry = {"type": kind, "coordinates": [lines[i].tolist() for i in refs]}
+                elif kind == "Polygon":
+                    coords = polygon(refs)
+                    geometry = {"type": kind, "coordinates": coords} if coords else None
+                else:
+                    coords = [p for p in map(polygon, refs) if p]
+                    geometry = {"type": kind, "coordinates": coords} if coords else None
+            if geometry is None:
+                continue  # collapsed below the tolerance
+            features.append({"type": "Feature", "properties": feature.get("properties"), "geometry": geometry})
+            vertices += _count_vertices(geometry.get("coordinates"))
+        return features, vertices
+
+
+def _count_vertices(coords):
+    if not coords:
+        return 0
+    if isinstance(coords[0], (int, float)):
+        return 1
+    return sum(_count_vertices(item) for item in coords)
+
+
+def simplify_layer(source, out_dir, zooms=None):
+    """Write out_dir/z<zoom>.geojson for each zoom; returns report rows"""
+    zooms = zooms if zooms is not None else lod_zooms
+    layer = LayerGeometry(list(iter_features(source)))
+    if not layer.lines:
+        return []
+
+    source_bytes = os.path.getsize(source)
+    source_vertices = layer.vertex_count
+    os.makedirs(out_dir, exist_ok=True)
+
+    report = []
+    for z in zooms:
+        features, vertices = layer.simplified(zoom_tolerance(z))
+        path = os.path.join(out_dir, f"z{z}.geojson")
+        with open(path, 'w') as f:
+            json.dump({"type": "FeatureCollection", "features": features}, f, separators=(',', ':'))
+        report.append({"zoom": z, "features": len(features),
+                       "vertices": vertices, "source_vertices": source_vertices,
+                       "bytes": os.path.getsize(path), "source_bytes": source_bytes})
+    return report
+
+
+def generate_lods(root=FEATURES_ROOT, out_root=None, zooms=None):
+    """Rebuild LOD variants for every line/polygon layer whose source changed"""
+    out_root = out_root or lod_root
+    zooms = list(zooms) if zooms is not None else list(lod_zooms)
+
+    total_saved = 0
+    for name, source in list_layers(root).items():
+        layer_dir = os.path.join(out_root, name)
+        previous = load_source_state(layer_dir)
+        fingerprint = file_fingerprint(source, previous)
+        if previous and previous.get("sha256") == fingerprint["sha256"] and previous.get("zooms") == zooms:
+            print(f"SKIP: {name} (unchanged)")
+            continue
+
+        report = simplify_layer(source, layer_dir, zooms)
+        if not report:
+            print(f"SKIP: {name} (no lines or polygons)")
+            continue
+
+        print(f"{name}:")
+        for row in report:
+            vertex_pct = 100.0 * row["vertices"] / row["source_vertices"]
+            byte_pct = 100.0 * row["bytes"] / row["source_bytes"]
+            print(f"   z{row['zoom']:<2d} {row['vertices']:>9,d}/{row['source_vertices']:,d} vertices ({vertex_pct:5.1f}%)"
+                  f"  {row['bytes'] / 1024:>9.1f}/{row['source_bytes'] / 1024:.1f} KB ({byte_pct:5.1f}%)")
+            total_saved += row["source_bytes"] - row["bytes"]
+
+        with open(os.path.join(layer_dir, "source.json"), 'w') as f:
+            json.dump(dict(fingerprint, source=source, zooms=zooms, report=report), f, indent=2)
+
+    print(f"\nBytes saved across rebuilt variants: {total_saved / (1024 * 1024):.2f} MB")
+
+
+if __name__ == "__main__":
+    generate_lods()
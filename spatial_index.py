@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Persistent R-tree spatial index for layers under features/
+Packs an STR (sort-tile-recursive) R-tree from each feature's bbox into flat
+arrays and saves it as a <layer>.geojson.rtree sidecar, together with the
+byte offset of every feature. A bbox query walks the tree and then seeks
+straight to the matching features in the .geojson.
+
+    python spatial_index.py                          # (re)build all sidecars
+    python spatial_index.py ne_10m_airports -10 35 30 60
+"""
+
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+
+from reader import FEATURES_ROOT, feature_bbox, iter_feature_spans, layer_path, list_layers, open_mapped
+
+SIDECAR_SUFFIX = ".rtree"
+NODE_CAPACITY = 16
+
+_MAGIC = b"NERT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIIQQq")  # magic, version, node capacity, levels, count, source size, source mtime_ns
+
+
+def _union(boxes, first, last):
+    """Bounding box of boxes[first:last] in a flat [minx, miny, maxx, maxy, ...] array"""
+    minx = min(boxes[4 * i] for i in range(first, last))
+    miny = min(boxes[4 * i + 1] for i in range(first, last))
+    maxx = max(boxes[4 * i + 2] for i in range(first, last))
+    maxy = max(boxes[4 * i + 3] for i in range(first, last))
+    return minx, miny, maxx, maxy
+
+
+def str_order(boxes, capacity=NODE_CAPACITY):
+    """Sort-tile-recursive ordering of the entries in a flat bbox array"""
+    count = len(boxes) // 4
+    leaves = math.ceil(count / capacity)
+    slices = max(1, math.ceil(math.sqrt(leaves)))
+    slab = slices * capacity
+
+    def center(i, axis):
+        return boxes[4 * i + axis] + boxes[4 * i + axis + 2]
+
+    by_x = sorted(range(count), key=lambda i: center(i, 0))
+    order = []
+    for first in range(0, count, slab):
+        order.extend(sorted(by_x[first:first + slab], key=lambda i: center(i, 1)))
+    return order
+
+
+class SpatialIndex:
+    """
+    Array-backed packed R-tree. levels[0] holds one bbox per feature (in STR
+    order) and levels[k] one bbox per node; the children of node i on level k
+    are entries i*capacity .. (i+1)*capacity-1 on level k-1.
+    """
+
+    def __init__(self, path, capacity, levels, offsets, lengths, source_size, source_mtime_ns):
+        self.path = path
+        self.capacity = capacity
+        self.levels = levels
+        self.offsets = offsets
+        self.lengths = lengths
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @classmethod
+    def build(cls, path, capacity=NODE_CAPACITY):
+        """Scan a layer once and pack its features into a tree"""
+        stat = os.stat(path)
+        boxes = array('d')
+        spans = []
+        with open_mapped(path) as buf:
+            for start, end in iter_feature_spans(buf):
+                bbox = feature_bbox(buf, start, end)
+                if bbox is None:
+                    continue
+                boxes.extend(bbox)
+                spans.append((start, end - start))
+
+        order = str_order(boxes, capacity)
+        leaf = array('d')
+        offsets = array('Q')
+        lengths = array('I')
+        for i in order:
+            leaf.extend(boxes[4 * i:4 * i + 4])
+            offsets.append(spans[i][0])
+            lengths.append(spans[i][1])
+
+        levels = [leaf]
+        while len(levels[-1]) > 4:
+            below = levels[-1]
+            entries = len(below) // 4
+            level = array('d')
+            for first in range(0, entries, capacity):
+                level.extend(_union(below, first, min(first + capacity, entries)))
+            levels.append(level)
+
+        return cls(path, capacity, levels, offsets, lengths, stat.st_size, stat.st_mtime_ns)
+
+    def save(self, sidecar=None):
+        """Write the tree next to the layer (atomically)"""
+        sidecar = sidecar or self.path + SIDECAR_SUFFIX
+        tmp_path = sidecar + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self.capacity, len(self.levels), len(self),
+                                 self.source_size, self.source_mtime_ns))
+            f.write(array('Q', [len(level) // 4 for level in self.levels]).tobytes())
+            f.write(self.offsets.tobytes())
+            f.write(self.lengths.tobytes())
+            for level in self.levels:
+                f.write(level.tobytes())
+        os.replace(tmp_path, sidecar)
+
+    @classmethod
+    def load(cls, path, sidecar=None):
+        """Read a sidecar written by save()"""
+        sidecar = sidecar or path + SIDECAR_SUFFIX
+        with open(sidecar, 'rb') as f:
+            magic, version, capacity, depth, count, size, mtime_ns = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{sidecar} is not a version {_VERSION} R-tree sidecar")
+
+            sizes = array('Q')
+            sizes.fromfile(f, depth)
+            offsets = array('Q')
+            offsets.fromfile(f, count)
+            lengths = array('I')
+            lengths.fromfile(f, count)
+            levels = []
+            for n in sizes:
+                level = array('d')
+                level.fromfile(f, 4 * n)
+                levels.append(level)
+
+        return cls(path, capacity, levels, offsets, lengths, size, mtime_ns)
+
+    def is_current(self):
+        """True while the layer on disk is the one the tree was built from"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime_ns
+
+    def search(self, bbox):
+        """Leaf positions whose bbox intersects bbox = (minx, miny, maxx, maxy)"""
+        minx, miny, maxx, maxy = bbox
+        if minx > maxx:
+            # Query crossing the antimeridian
+            return self.search((minx, miny, 180.0, maxy)) + self.search((-180.0, miny, maxx, maxy))
+
+        hits = []
+        if not self.offsets:
+            return hits
+
+        capacity = self.capacity
+        stack = [(len(self.levels) - 1, 0)]
+        while stack:
+            depth, node = stack.pop()
+            boxes = self.levels[depth]
+            if depth == len(self.levels) - 1:
+                first, last = 0, len(boxes) // 4
+            else:
+                first = node * capacity
+                last = min(first + capacity, len(boxes) // 4)
+
+            for i in range(first, last):
+                j = 4 * i
+                if boxes[j] > maxx or boxes[j + 2] < minx or boxes[j + 1] > maxy or boxes[j + 3] < miny:
+                    continue
+                if depth == 0:
+                    hits.append(i)
+                else:
+                    stack.append((depth - 1, i))
+        return hits
+
+    def features(self, bbox):
+        """Decode only the features whose bbox intersects the query, in file order"""
+        positions = sorted(set(self.search(bbox)), key=lambda i: self.offsets[i])
+        results = []
+        with open(self.path, 'rb') as f:
+            for i in positions:
+                f.seek(self.offsets[i])
+                results.append(json.loads(f.read(self.lengths[i])))
+        return results
+
+
+def build_index(layer, root=FEATURES_ROOT):
+    """Build and save the sidecar for one layer"""
+    index = SpatialIndex.build(layer_path(layer, root))
+    index.save()
+    return index
+
+
+_loaded = {}
+
+
+def load_index(layer, root=FEATURES_ROOT):
+    """Open a layer's index, rebuilding the sidecar if the layer changed"""
+    path = layer_path(layer, root)
+    index = _loaded.get(path)
+    if index is not None and index.is_current():
+        return index
+
+    try:
+        index = SpatialIndex.load(path)
+    except (OSError, ValueError):
+        index = None
+    if index is None or not index.is_current():
+        index = SpatialIndex.build(path)
+        index.save()
+
+    _loaded[path] = index
+    return index
+
+
+def query(layer, bbox, root=FEATURES_ROOT):
+    """Features of `layer` whose bbox intersects bbox = (minx, miny, maxx, maxy)"""
+    return load_index(layer, root).features(bbox)
+
+
+if __name__ == "__main__":
+    import time
+
+    if len(sys.argv) == 6:
+        layer = sys.argv[1]
+        bbox = tuple(float(value) for value in sys.argv[2:])
+        started = time.perf_counter()
+        found = query(layer, bbox)
+        elapsed = time.perf_counter() - started
+        for feature in found:
+            sys.stdout.write(json.dumps(feature) + '\n')
+        print(f"{len(found)} features in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    elif len(sys.argv) == 1:
+        for name, path in list_layers().items():
+            started = time.perf_counter()
+            index = build_index(path)
+            print(f"{name}: {len(index)} features, {len(index.levels)} levels "
+                  f"({time.perf_counter() - started:.2f}s)")
+    else:
+        print("Usage: spatial_index.py [layer minx miny maxx maxy]")
+        sys.exit(1)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Persisted sync manifest for downloaded layers
+Remembers ETag, Last-Modified, size and content hash per saved file so the
+next run can send conditional requests and skip unchanged layers (304)
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+
+def sha256_file(filepath, chunk_size=1024 * 1024):
+    """Hex sha256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(filepath, previous=None):
+    """
+    {"size", "mtime_ns", "sha256"} for a file. The hash in `previous` is
+    reused when size and mtime are unchanged, so unchanged files are not
+    read again.
+    """
+    stat = os.stat(filepath)
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        sha256 = previous["sha256"]
+    else:
+        sha256 = sha256_file(filepath)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+
+
+class SyncManifest:
+    """JSON manifest keyed by the saved file path"""
+
+    def __init__(self, path="sync_manifest.json"):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f).get("files", {})
+
+    @staticmethod
+    def key(filepath):
+        return os.path.normpath(filepath).replace('\\', '/')
+
+    def get(self, filepath):
+        with self.lock:
+            return self.entries.get(self.key(filepath))
+
+    def local_copy_matches(self, filepath):
+        """True if the file on disk is the one the manifest describes"""
+        entry = self.get(filepath)
+        if entry is None or not os.path.exists(filepath):
+            return False
+
+        stat = os.stat(filepath)
+        if stat.st_size != entry.get("size"):
+            return False
+        if stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+
+        # Touched but maybe not modified: fall back to the content hash
+        if sha256_file(filepath) != entry.get("sha256"):
+            return False
+        with self.lock:
+            entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def conditional_headers(self, filepath):
+        """If-None-Match / If-Modified-Since for an intact local copy, else {}"""
+        if not self.local_copy_matches(filepath):
+            return {}
+
+        entry = self.get(filepath)
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, filepath, url, etag, last_modified, size, sha256):
+        """Store validators for a freshly written file"""
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "size": size,
+            "sha256": sha256,
+            "mtime_ns": os.stat(filepath).st_mtime_ns,
+        }
+        with self.lock:
+            self.entries[self.key(filepath)] = entry
+
+    def save(self):
+        """Write the manifest atomically"""
+        with self.lock:
+            data = {"version": 1, "files": dict(sorted(self.entries.items()))}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
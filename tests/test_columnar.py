@@ -0,0 +1,15 @@
+from columnar import ColumnStore
+
+
+def test_close_with_a_live_view():
+    with ColumnStore.open("ne_10m_airports") as store:
+        ranks = store.array("scalerank")
+    assert ranks.sum() > 0  # still readable after close
+
+
+def test_conditions_with_a_mismatched_value_type():
+    with ColumnStore.open("ne_10m_airports") as store:
+        assert not store.mask([("abbrev", "==", 123)]).any()
+        assert not store.mask([("scalerank", "<=", "3")]).any()
+        assert not store.mask([("abbrev", "in", [123])]).any()
+        assert (store.mask([("abbrev", "!=", 123)]) == store.mask([("abbrev", "not null")])).all()
@@ -0,0 +1,106 @@
+import hashlib
+import os
+
+import pytest
+
+from downloader import run_downloads, write_part_info
+from local_mirror import start_mirror
+from sync_manifest import SyncManifest
+
+
+@pytest.fixture(scope="module")
+def mirror():
+    server, base_url = start_mirror(root=".")
+    yield base_url, {route.lstrip('/'): path for route, path in server.RequestHandlerClass.routes.items()}
+    server.shutdown()
+    server.server_close()
+
+
+def _job(base_url, name, directory, headers=None):
+    return {"name": name, "url": base_url + name, "path": os.path.join(directory, name), "headers": headers or {}}
+
+
+def _download(jobs, workers=1):
+    return {result["name"]: result for result in run_downloads(jobs, workers, rate=1e6, burst=len(jobs))}
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _etag(base_url, name, directory):
+    first = directory / "first"
+    first.mkdir()
+    result = _download([_job(base_url, name, first)])[name]
+    assert result["etag"]
+    return result["etag"]
+
+
+def test_concurrent_downloads_land_at_the_final_path(mirror, tmp_path):
+    base_url, files = mirror
+    results = _download([_job(base_url, name, tmp_path) for name in files], workers=4)
+
+    assert set(results) == set(files)
+    for name, source in files.items():
+        result = results[name]
+        expected = _read(source)
+        assert result["status"] == "downloaded"
+        assert _read(result["path"]) == expected
+        assert result["sha256"] == hashlib.sha256(expected).hexdigest()
+        assert not os.path.exists(result["path"] + ".part")
+
+
+def test_second_run_with_manifest_headers_is_not_modified(mirror, tmp_path):
+    base_url, files = mirror
+    name = sorted(files)[0]
+    manifest = SyncManifest(str(tmp_path / "sync_manifest.json"))
+
+    first = _download([_job(base_url, name, tmp_path)])[name]
+    manifest.record(first["path"], first["url"], first["etag"], first["last_modified"], first["size"], first["sha256"])
+    mtime_ns = os.stat(first["path"]).st_mtime_ns
+
+    headers = manifest.conditional_headers(first["path"])
+    assert headers
+    second = _download([_job(base_url, name, tmp_path, headers)])[name]
+    assert second["status"] == "unchanged"
+    assert second["bytes"] == 0
+    assert os.stat(first["path"]).st_mtime_ns == mtime_ns
+
+
+def test_truncated_part_resumes_with_a_range_request(mirror, tmp_path):
+    base_url, files = mirror
+    name = sorted(files)[0]
+    expected = _read(files[name])
+    etag = _etag(base_url, name, tmp_path)
+
+    job = _job(base_url, name, tmp_path)
+    half = len(expected) // 2
+    with open(job["path"] + ".part", 'wb') as f:
+        f.write(expected[:half])
+    write_part_info(job["path"] + ".part", job["url"], etag, None)
+
+    result = _download([job])[name]
+    assert result["status"] == "downloaded"
+    assert result["resumed_from"] == half
+    assert result["bytes"] == len(expected) - half
+    assert result["sha256"] == hashlib.sha256(expected).hexdigest()
+    assert _read(job["path"]) == expected
+
+
+def test_part_past_the_end_restarts_after_416(mirror, tmp_path):
+    base_url, files = mirror
+    name = sorted(files)[0]
+    expected = _read(files[name])
+    etag = _etag(base_url, name, tmp_path)
+
+    job = _job(base_url, name, tmp_path)
+    with open(job["path"] + ".part", 'wb') as f:
+        f.write(expected + b"stale tail")
+    write_part_info(job["path"] + ".part", job["url"], etag, None)
+
+    result = _download([job])[name]
+    assert result["status"] == "downloaded"
+    assert result["resumed_from"] == 0
+    assert _read(job["path"]) == expected
+    assert not os.path.exists(job["path"] + ".part.json")
@@ -0,0 +1,19 @@
+import json
+import os
+
+import pytest
+
+from feature_server import FeatureServer
+
+
+@pytest.mark.parametrize("root", ["features", os.path.abspath("features")])
+def test_static_files_resolve_under_any_root(root):
+    server = FeatureServer(root=root)
+    listed = json.loads(server.layer_list()[0])["ne_10m_ports"]
+    assert listed["file"] == "/features/transportation/ne_10m_ports.geojson"
+
+    status, _, body = server.respond("GET", listed["file"], {})
+    assert status == 200
+    with open(os.path.join("features", "transportation", "ne_10m_ports.geojson"), 'rb') as f:
+        assert body == f.read()
+    assert server.respond("GET", "/features/../requests.jsonl", {})[0] == 404
@@ -0,0 +1,29 @@
+import numpy as np
+
+from simplify import LayerGeometry
+
+
+def _ring(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    radii = 1 + 0.1 * rng.random(n)
+    ring = np.column_stack([radii * np.cos(angles), radii * np.sin(angles)]).round(6)
+    return np.vstack([ring, ring[:1]])
+
+
+def test_shared_junction_free_ring_simplifies_identically():
+    ring = _ring()
+    rotated_hole = np.roll(ring[:-1], -57, axis=0)[::-1]
+    rotated_hole = np.vstack([rotated_hole, rotated_hole[:1]])
+    frame = [[-3, -3], [3, -3], [3, 3], [-3, 3], [-3, -3]]
+    features = [
+        {"properties": {}, "geometry": {"type": "Polygon", "coordinates": [ring.tolist()]}},
+        {"properties": {}, "geometry": {"type": "Polygon", "coordinates": [frame, rotated_hole.tolist()]}},
+    ]
+
+    simplified, _ = LayerGeometry(features).simplified(0.02)
+    outer = simplified[0]["geometry"]["coordinates"][0]
+    hole = simplified[1]["geometry"]["coordinates"][1]
+
+    assert len(outer) < len(ring)
+    assert {tuple(p) for p in outer} == {tuple(p) for p in hole}
@@ -0,0 +1,28 @@
+import json
+import os
+
+import pytest
+
+from feature_server import FeatureServer
+from reader import list_layers
+from tiles import cut_layer, max_zoom
+
+ZOOMS = [0, 2, 3]
+
+
+@pytest.mark.parametrize("name", ["ne_10m_airports", "ne_10m_reefs", "admin_0_lines"])
+def test_cut_layer_matches_server_tiles(tmp_path, name):
+    source = list_layers()[name]
+    cut_layer(source, str(tmp_path), ZOOMS, max_zoom)
+    server = FeatureServer()
+
+    for z in ZOOMS:
+        for x in range(2 ** z):
+            for y in range(2 ** z):
+                expected = json.loads(server.tile(name, z, x, y)[0])["features"]
+                path = os.path.join(tmp_path, str(z), str(x), f"{y}.geojson")
+                written = []
+                if os.path.exists(path):
+                    with open(path) as f:
+                        written = json.load(f)["features"]
+                assert written == expected, f"{name} {z}/{x}/{y}"
@@ -0,0 +1,26 @@
+import numpy as np
+
+from topobin import encode_features
+
+
+def _ring(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    radii = 1 + 0.1 * rng.random(n)
+    ring = np.column_stack([radii * np.cos(angles), radii * np.sin(angles)]).round(6)
+    return np.vstack([ring, ring[:1]])
+
+
+def test_shared_junction_free_ring_is_one_topobin_arc():
+    ring = _ring()
+    hole = np.roll(ring[:-1], 31, axis=0)[::-1]
+    hole = np.vstack([hole, hole[:1]])
+    frame = [[-3, -3], [3, -3], [3, 3], [-3, 3], [-3, -3]]
+    features = [
+        {"properties": {}, "geometry": {"type": "Polygon", "coordinates": [ring.tolist()]}},
+        {"properties": {}, "geometry": {"type": "Polygon", "coordinates": [frame, hole.tolist()]}},
+    ]
+    _, sections = encode_features(features)
+
+    # The frame and the shared ring
+    assert len(sections.arrays["arc_offsets"]) - 1 == 2
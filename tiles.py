@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Cut every layer under features/ into a z/x/y GeoJSON tile pyramid
+Run after data.py. Features enter a zoom level once their min_zoom (or
+scalerank when a layer has no min_zoom) is reached; geometries are clipped
+to each tile (plus a small buffer). A layer is only re-cut when its source
+file changed. Each layer is decoded once, then cut and written one zoom
+at a time; layers are spread over a process pool.
+
+Output: tiles/<layer>/<z>/<x>/<y>.geojson
+"""
+
+import json
+import math
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from reader import FEATURES_ROOT, geometry_bbox, get_property, iter_features, list_layers
+from sync_manifest import file_fingerprint
+
+# Configuration
+tiles_root = "tiles"
+min_zoom = 0
+max_zoom = 6
+tile_buffer = 1 / 64  # fraction of the tile size added on every side before clipping
+coordinate_precision = 6
+
+MAX_LATITUDE = 85.0511287798
+
+
+def _x_position(lon, z):
+    return (lon + 180.0) / 360.0 * 2 ** z
+
+
+def _y_position(lat, z):
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    return (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * 2 ** z
+
+
+def lon_to_x(lon, z):
+    """Tile column containing a longitude"""
+    return min(2 ** z - 1, max(0, int(_x_position(lon, z))))
+
+
+def lat_to_y(lat, z):
+    """Tile row containing a latitude (Web Mercator)"""
+    return min(2 ** z - 1, max(0, int(_y_position(lat, z))))
+
+
+def tile_bounds(z, x, y, buffer=0.0):
+    """(west, south, east, north) of a tile in degrees, grown by `buffer` tile sizes"""
+    n = 2 ** z
+
+    def lon(col):
+        return col / n * 360.0 - 180.0
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    west, east = lon(x - buffer), lon(x + 1 + buffer)
+    north, south = lat(y - buffer), lat(y + 1 + buffer)
+    if y == 0:
+        north = 90.0
+    if y == n - 1:
+        south = -90.0
+    return west, south, east, north
+
+
+def tile_range(bbox, z, buffer=0.0):
+    """All (x, y) tiles at zoom z whose bounds, grown by `buffer` tile sizes, meet bbox"""
+    minx, miny, maxx, maxy = bbox
+    last = 2 ** z - 1
+    # A tile is touched when its grown edges reach the bbox, so the first
+    # index is the smallest one whose far edge (index + 1 + buffer) is past it
+    x0 = max(0, math.ceil(_x_position(minx, z) - 1 - buffer))
+    x1 = min(last, math.floor(_x_position(maxx, z) + buffer))
+    y0 = max(0, math.ceil(_y_position(maxy, z) - 1 - buffer))
+    y1 = min(last, math.floor(_y_position(miny, z) + buffer))
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            yield x, y
+
+
+def feature_min_zoom(properties):
+    """Zoom at which a feature first appears"""
+    value = get_property(properties, "min_zoom")
+    if value is None:
+        value = get_property(properties, "scalerank")
+    return value if isinstance(value, (int, float)) else 0
+
+
+def _inside(point, box):
+    return box[0] <= point[0] <= box[2] and box[1] <= point[1] <= box[3]
+
+
+def _clip_segment(p0, p1, box):
+    """Liang-Barsky: (t0, t1, start, end) of the part of p0-p1 inside box, or None"""
+    x0, y0 = p0[0], p0[1]
+    dx, dy = p1[0] - x0, p1[1] - y0
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x0 - box[0]), (dx, box[2] - x0), (-dy, y0 - box[1]), (dy, box[3] - y0)):
+        if p == 0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            if t > t1:
+                return None
+            t0 = max(t0, t)
+        else:
+            if t < t0:
+                return None
+            t1 = min(t1, t)
+    start = [x0 + t0 * dx, y0 + t0 * dy] if t0 > 0 else [x0, y0]
+    end = [x0 + t1 * dx, y0 + t1 * dy] if t1 < 1 else [p1[0], p1[1]]
+    return t0, t1, start, end
+
+
+def clip_line(coords, box):
+    """Clip a LineString's coordinates; returns a list of parts"""
+    if len(coords) == 1:
+        return [coords] if _inside(coords[0], box) else []
+
+    parts = []
+    current = []
+    for p0, p1 in zip(coords, coords[1:]):
+        clipped = _clip_segment(p0, p1, box)
+        if clipped is None:
+            continue
+        t0, t1, start, end = clipped
+        if t0 > 0 or not current:
+            if len(current) > 1:
+                parts.append(current)
+            current = [start]
+        current.append(end)
+        if t1 < 1:
+            parts.append(current)
+            current = []
+    if len(current) > 1:
+        parts.append(current)
+    return parts
+
+
+def clip_ring(ring, box):
+    """Sutherland-Hodgman clip of a closed ring; returns a closed ring or None"""
+    points = ring[:-1] if len(ring) > 1 and ring[0] == ring[-1] else list(ring)
+
+    for axis, limit, keep_greater in ((0, box[0], True), (0, box[2], False), (1, box[1], True), (1, box[3], False)):
+        if not points:
+            return None
+
+        def inside(p):
+            return p[axis] >= limit if keep_greater else p[axis] <= limit
+
+        def crossing(a, b):
+            t = (limit - a[axis]) / (b[axis] - a[axis])
+            point = [a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1])]
+            point[axis] = limit
+            return point
+
+        output = []
+        previous = points[-1]
+        for point in points:
+            if inside(point):
+                if not inside(previous):
+                    output.append(crossing(previous, point))
+                output.append(point)
+            elif inside(previous):
+                output.append(crossing(previous, point))
+            previous = point
+        points = output
+
+    if len(points) < 3:
+        return None
+    return points + [points[0]]
+
+
+def _clip_polygon(rings, box):
+    if not rings:
+        return None
+    outer = clip_ring(rings[0], box)
+    if outer is None:
+        return None
+    return [outer] + [hole for hole in (clip_ring(ring, box) for ring in rings[1:]) if hole]
+
+
+def clip_geometry(geometry, box):
+    """Clip any GeoJSON geometry to box = (west, south, east, north); None if nothing is left"""
+    if not geometry:
+        return None
+    kind = geometry["type"]
+    coords = geometry.get("coordinates")
+
+    if kind == "Point":
+        return geometry if _inside(coords, box) else None
+    if kind == "MultiPoint":
+        points = [p for p in coords if _inside(p, box)]
+        return {"type": "MultiPoint", "coordinates": points} if points else None
+    if kind in ("LineString", "MultiLineString"):
+        lines = [coords] if kind == "LineString" else coords
+        parts = [part for line in lines for part in clip_line(line, box)]
+        if not parts:
+            return None
+        if len(parts) == 1:
+            return {"type": "LineString", "coordinates": parts[0]}
+        return {"type": "MultiLineString", "coordinates": parts}
+    if kind in ("Polygon", "MultiPolygon"):
+        polygons = [coords] if kind == "Polygon" else coords
+        clipped = [p for p in (_clip_polygon(rings, box) for rings in polygons) if p]
+        if not clipped:
+            return None
+        if len(clipped) == 1:
+            return {"type": "Polygon", "coordinates": clipped[0]}
+        return {"type": "MultiPolygon", "coordinates": clipped}
+    if kind == "GeometryCollection":
+        parts = [p for p in (clip_geometry(g, box) for g in geometry.get("geometries", [])) if p]
+        return {"type": "GeometryCollection", "geometries": parts} if parts else None
+    return None
+
+
+def _round(coords, digits):
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(value, digits) for value in coords]
+    return [_round(item, digits) for item in coords]
+
+
+def visible_at(properties, z, top_zoom=None):
+    """True if a feature belongs at zoom z; the top zoom of a pyramid keeps everything"""
+    return (top_zoom is not None and z >= top_zoom) or feature_min_zoom(properties) <= z
+
+
+def tile_feature(feature, z, x, y, buffer=tile_buffer, digits=coordinate_precision):
+    """A copy of `feature` clipped to tile z/x/y, or None if it does not reach it"""
+    geometry = clip_geometry(feature.get("geometry"), tile_bounds(z, x, y, buffer))
+    if geometry is None:
+        return None
+    if "coordinates" in geometry:
+        geometry = {"type": geometry["type"], "coordinates": _round(geometry["coordinates"], digits)}
+    return {"type": "Feature", "properties": feature.get("properties") or {}, "geometry": geometry}
+
+
+def cut_layer(source, out_dir, zooms, top_zoom, buffer=tile_buffer, digits=coordinate_precision):
+    """
+    Cut every zoom level of one layer into out_dir/z/x/y.geojson, decoding
+    the layer once; only one zoom's tiles are held at a time. Returns tiles
+    written.
+    """
+    features = []
+    for feature in iter_features(source):
+        bbox = feature.get("bbox") or geometry_bbox(feature.get("geometry"))
+        if bbox is None:
+            continue
+        if len(bbox) == 6:
+            bbox = [bbox[0], bbox[1], bbox[3], bbox[4]]
+        features.append((feature, feature.get("properties") or {}, bbox))
+
+    written = 0
+    for z in zooms:
+        tiles = {}
+        for feature, properties, bbox in features:
+            if not visible_at(properties, z, top_zoom):
+                continue
+            for x, y in tile_range(bbox, z, buffer):
+                clipped = tile_feature(feature, z, x, y, buffer, digits)
+                if clipped is not None:
+                    tiles.setdefault((x, y), []).append(clipped)
+
+        for (x, y), tile in tiles.items():
+            tile_dir = os.path.join(out_dir, str(z), str(x))
+            os.makedirs(tile_dir, exist_ok=True)
+            with open(os.path.join(tile_dir, f"{y}.geojson"), 'w') as f:
+                json.dump({"type": "FeatureCollection", "features": tile}, f, separators=(',', ':'))
+        written += len(tiles)
+    return written
+
+
+def load_source_state(layer_dir):
+    try:
+        with open(os.path.join(layer_dir, "source.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def generate_tiles(root=FEATURES_ROOT, out_root=None, zooms=None, workers=None):
+    """Rebuild the tile pyramid of every layer whose source changed"""
+    out_root = out_root or tiles_root
+    zooms = list(zooms) if zooms is not None else list(range(min_zoom, max_zoom + 1))
+    top_zoom = max(zooms)
+    layers = list_layers(root)
+
+    print(f"Checking {len(layers)} layers for changes...")
+    stale = {}
+    for name, source in layers.items():
+        layer_dir = os.path.join(out_root, name)
+        previous = load_source_state(layer_dir)
+        fingerprint = file_fingerprint(source, previous)
+        if previous and previous.get("sha256") == fingerprint["sha256"] and previous.get("zooms") == zooms:
+            print(f"   SKIP: {name} (unchanged)")
+            continue
+        stale[name] = (source, fingerprint)
+
+    if not stale:
+        print("All tiles up to date")
+        return
+
+    print(f"Cutting {len(stale)} layers at zooms {zooms[0]}-{zooms[-1]}...")
+    counts = {name: 0 for name in stale}
+    failed = set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for name, (source, fingerprint) in stale.items():
+            building = os.path.join(out_root, f".{name}.building")
+            shutil.rmtree(building, ignore_errors=True)
+            futures[executor.submit(cut_layer, source, building, zooms, top_zoom)] = name
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                counts[name] = future.result()
+            except Exception as e:
+                print(f"   ERROR: {name}: {e}")
+                failed.add(name)
+
+    for name, (source, fingerprint) in stale.items():
+        building = os.path.join(out_root, f".{name}.building")
+        if name in failed:
+            shutil.rmtree(building, ignore_errors=True)
+            continue
+        os.makedirs(building, exist_ok=True)
+        with open(os.path.join(building, "source.json"), 'w') as f:
+            json.dump(dict(fingerprint, source=source, zooms=zooms), f, indent=2)
+
+        layer_dir = os.path.join(out_root, name)
+        shutil.rmtree(layer_dir, ignore_errors=True)
+        os.replace(building, layer_dir)
+        print(f"   SUCCESS: {name} ({counts[name]} tiles)")
+
+    print(f"\nTiles written under: {out_root}/")
+
+
+if __name__ == "__main__":
+    generate_tiles()
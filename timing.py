@@ -0,0 +1,84 @@
+"""
+Optional structured timing spans for the download and processing pipeline
+Spans are off by default and then cost one attribute check. Enable them by
+setting NE_TIMING to a JSON-lines file path, or call enable() with any
+callable that accepts a span dict (e.g. a metrics client adapter):
+
+    NE_TIMING=timings.jsonl python data.py
+
+Each span is one record:
+    {"span": "download.body", "start": <unix time>, "ms": 12.3, "file": "...", ...}
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_sinks = []
+_lock = threading.Lock()
+
+
+def enabled():
+    return bool(_sinks)
+
+
+def enable(sink):
+    """Send every finished span to sink(record)"""
+    _sinks.append(sink)
+    return sink
+
+
+def disable(sink=None):
+    """Stop sending spans to sink (or to every sink)"""
+    if sink is None:
+        _sinks.clear()
+    elif sink in _sinks:
+        _sinks.remove(sink)
+
+
+class JsonLinesSink:
+    """Append span records to a file, one JSON object per line"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, record):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with _lock, open(self.path, 'a') as f:
+            f.write(line)
+
+
+def emit(name, start, seconds, **attrs):
+    """Record an already measured span (start is a time.time() value)"""
+    if not _sinks:
+        return
+    record = {"span": name, "start": round(start, 6), "ms": round(seconds * 1000, 3)}
+    record.update(attrs)
+    for sink in list(_sinks):
+        sink(record)
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Time the enclosed block as one span. Yields a dict; keys added to it
+    inside the block (bytes, status, ...) are attached to the record.
+    """
+    if not _sinks:
+        yield attrs
+        return
+    start = time.time()
+    began = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        emit(name, start, time.perf_counter() - began, **attrs)
+
+
+if os.environ.get("NE_TIMING"):
+    enable(JsonLinesSink(os.environ["NE_TIMING"]))
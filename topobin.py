@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Compact binary export of the GeoJSON layers (.topobin, TopoJSON-style)
+Coordinates are quantized to an integer grid. Lines and rings are cut into
+shared arcs at topological junctions, so a border between two features is
+stored once. Each arc is stored as delta-encoded int16/int32 vertices.
+Properties are kept as a typed, dictionary-encoded column table (columnar.py).
+
+The file is a small JSON header followed by 8-byte aligned sections that
+the reader maps straight into NumPy arrays (np.frombuffer over mmap), so
+opening a layer copies nothing.
+
+    python topobin.py     # write <layer>.topobin next to every changed layer
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from columnar import MappedSections, Sections, encode_properties, read_sectioned_header, write_sectioned
+from reader import FEATURES_ROOT, geometry_bbox, iter_features, list_layers
+from simplify import LayerGeometry, split_at_junctions
+from sync_manifest import file_fingerprint
+
+SUFFIX = ".topobin"
+DEFAULT_QUANTIZATION = 1e-6  # grid step in degrees; matches the 6 decimals of the source files
+GEOMETRY_TYPES = [None, "Point", "MultiPoint", "LineString", "MultiLineString", "Polygon", "MultiPolygon"]
+
+_MAGIC = b"NETOPO\x00\x01"
+
+
+def encode_features(features, quantization=DEFAULT_QUANTIZATION):
+    """Build (header, sections) for a list of GeoJSON features"""
+    boxes = [b for b in (geometry_bbox(f.get("geometry")) for f in features) if b]
+    translate = [min(b[0] for b in boxes), min(b[1] for b in boxes)] if boxes else [0.0, 0.0]
+
+    def quantize(coords):
+        return np.round((np.asarray(coords, dtype=float)[..., :2] - translate) / quantization)
+
+    # Quantized copies of the line/polygon features; LayerGeometry finds their junctions
+    quantized = []
+    for feature in features:
+        geometry = feature.get("geometry")
+        if geometry and geometry["type"] in ("LineString", "MultiLineString", "Polygon", "MultiPolygon"):
+            kind = geometry["type"]
+            coords = geometry["coordinates"]
+            if kind == "LineString":
+                coords = quantize(coords)
+            elif kind in ("MultiLineString", "Polygon"):
+                coords = [quantize(line) for line in coords]
+            else:
+                coords = [[quantize(ring) for ring in polygon] for polygon in coords]
+            geometry = {"type": kind, "coordinates": coords}
+        quantized.append({"geometry": geometry})
+    layer = LayerGeometry(quantized)
+
+    arcs = []
+    arc_ids = {}
+
+    def arc_ref(arc):
+        arc = arc.astype(np.int64)
+        key = arc.tobytes()
+        if key in arc_ids:
+            return arc_ids[key]
+        reverse_key = arc[::-1].tobytes()
+        if reverse_key in arc_ids:
+            return ~arc_ids[reverse_key]
+        arc_ids[key] = len(arcs)
+        arcs.append(arc)
+        return arc_ids[key]
+
+    line_refs = [
+        [arc_ref(arc) for arc in split_at_junctions(line, is_closed, junctions)]
+        for line, is_closed, junctions in zip(layer.lines, layer.closed, layer.junctions)
+    ]
+
+    # Geometry table: feature -> parts (polygons) -> rings (lines) -> refs (arcs or points)
+    geom_types, feature_parts, part_rings, ring_refs, refs, points = [], [0], [0], [0], [], []
+
+    def add_ring(ring_ref_list):
+        refs.extend(ring_ref_list)
+        ring_refs.append(len(refs))
+
+    def add_part(rings):
+        for ring in rings:
+            add_ring(ring)
+        part_rings.append(len(ring_refs) - 1)
+
+    for feature, template in zip(features, layer.templates):
+        geometry = feature.get("geometry")
+        kind = geometry["type"] if geometry else None
+        if kind not in GEOMETRY_TYPES:
+            kind = None  # GeometryCollection is not supported by the format
+        if kind in ("Point", "MultiPoint"):
+            coords = [geometry["coordinates"]] if kind == "Point" else geometry["coordinates"]
+            add_part([list(range(len(points), len(points) + len(coords)))])
+            points.extend(quantize(coords).tolist() if coords else [])
+        elif kind in ("LineString", "MultiLineString", "Polygon"):
+            lines = [template[1]] if kind == "LineString" else template[1]
+            add_part([line_refs[i] for i in lines])
+        elif kind == "MultiPolygon":
+            for polygon in template[1]:
+                add_part([line_refs[i] for i in polygon])
+        geom_types.append(GEOMETRY_TYPES.index(kind))
+        feature_parts.append(len(part_rings) - 1)
+
+    # Arcs: first vertex absolute, then deltas
+    arc_offsets = np.zeros(len(arcs) + 1, dtype=np.uint32)
+    arc_offsets[1:] = np.cumsum([len(arc) for arc in arcs])
+    deltas = np.vstack([np.vstack([arc[:1], np.diff(arc, axis=0)]) for arc in arcs]) if arcs else np.zeros((0, 2))
+    delta_dtype = np.int16 if deltas.size == 0 or np.abs(deltas).max() < 2 ** 15 else np.int32
+
+    sections = Sections()
+    sections.add("geom_types", np.array(geom_types, dtype=np.uint8))
+    sections.add("feature_parts", np.array(feature_parts, dtype=np.uint32))
+    sections.add("part_rings", np.array(part_rings, dtype=np.uint32))
+    sections.add("ring_refs", np.array(ring_refs, dtype=np.uint32))
+    sections.add("refs", np.array(refs, dtype=np.int32))
+    sections.add("arc_offsets", arc_offsets)
+    sections.add("arc_deltas", deltas.astype(delta_dtype).ravel())
+    sections.add("points", np.array(points, dtype=np.int32).reshape(-1, 2).ravel())
+
+    columns = encode_properties(sections, [feature.get("properties") or {} for feature in features])
+
+    header = {
+        "count": len(features),
+        "transform": {"scale": [quantization, quantization], "translate": translate},
+        "columns": columns,
+    }
+    return header, sections
+
+
+def write_topobin(features, path, quantization=DEFAULT_QUANTIZATION, **extra):
+    """Encode features and write them to path atomically"""
+    header, sections = encode_features(features, quantization)
+    header.update(extra)
+    write_sectioned(path, _MAGIC, header, sections)
+
+
+def read_header(path):
+    """Only the JSON header of a .topobin file"""
+    return read_sectioned_header(path, _MAGIC)
+
+
+class TopoBinLayer(MappedSections):
+    """Memory-mapped reader; every section is a zero-copy NumPy view"""
+
+    magic = _MAGIC
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._coords = None
+        self.scale = np.array(self.header["transform"]["scale"])
+        self.translate = np.array(self.header["transform"]["translate"])
+
+    def close(self):
+        self._coords = None
+        super().close()
+
+    def arc(self, index):
+        """Vertices of one arc in degrees, shape (n, 2)"""
+        offsets = self.section("arc_offsets")
+        deltas = self.section("arc_deltas").reshape(-1, 2)[offsets[index]:offsets[index + 1]]
+        return np.cumsum(deltas, axis=0, dtype=np.int64) * self.scale + self.translate
+
+    def _all_arcs(self):
+        """Every arc vertex decoded at once (cumsum restarted at each arc)"""
+        if self._coords is None:
+            offsets = self.section("arc_offsets").astype(np.int64)
+            totals = np.cumsum(self.section("arc_deltas").reshape(-1, 2), axis=0, dtype=np.int64)
+            before = np.vstack([np.zeros((1, 2), dtype=np.int64), totals])[offsets[:-1]]
+            restart = np.repeat(before, np.diff(offsets), axis=0)
+            self._coords = (totals - restart) * self.scale + self.translate
+        return self._coords
+
+    def _line(self, ring_refs):
+        coords = self._all_arcs()
+        offsets = self.section("arc_offsets")
+        line = []
+        for ref in ring_refs:
+            arc = coords[offsets[ref]:offsets[ref + 1]] if ref >= 0 else coords[offsets[~ref]:offsets[~ref + 1]][::-1]
+            line.extend(arc.tolist() if not line else arc[1:].tolist())
+        return line
+
+    def geometry(self, index):
+        """GeoJSON geometry of feature `index`"""
+        kind = GEOMETRY_TYPES[self.section("geom_types")[index]]
+        if kind is None:
+            return None
+        feature_parts = self.section("feature_parts")
+        part_rings = self.section("part_rings")
+        ring_refs = self.section("ring_refs")
+        refs = self.section("refs")
+
+        parts = []
+        for part in range(feature_parts[index], feature_parts[index + 1]):
+            rings = []
+            for ring in range(part_rings[part], part_rings[part + 1]):
+                ring_ref_list = refs[ring_refs[ring]:ring_refs[ring + 1]]
+                if kind in ("Point", "MultiPoint"):
+                    xy = self.section("points").reshape(-1, 2)[ring_ref_list] * self.scale + self.translate
+                    rings.append(xy.tolist())
+                else:
+                    rings.append(self._line(ring_ref_list))
+            parts.append(rings)
+
+        if kind == "Point":
+            coords = parts[0][0][0]
+        elif kind == "MultiPoint":
+            coords = parts[0][0]
+        elif kind == "LineString":
+            coords = parts[0][0]
+        elif kind in ("MultiLineString", "Polygon"):
+            coords = parts[0]
+        else:
+            coords = parts
+        return {"type": kind, "coordinates": coords}
+
+    def properties(self, index, names=None):
+        return {name: self.value(name, index) for name in (names or self.columns)}
+
+    def feature(self, index, names=None):
+        return {"type": "Feature", "properties": self.properties(index, names), "geometry": self.geometry(index)}
+
+    def __iter__(self):
+        names = list(self.columns)
+        columns = [self.column(name) for name in names]
+        for index, row in enumerate(zip(*columns) if columns else ([()] * len(self))):
+            yield {"type": "Feature", "properties": dict(zip(names, row)), "geometry": self.geometry(index)}
+
+
+def convert_layer(source, target=None, quantization=DEFAULT_QUANTIZATION, force=False):
+    """Write <layer>.topobin next to source unless it is already current; returns target or None"""
+    target = target or source[:-len('.geojson')] + SUFFIX
+    previous = None
+    if os.path.exists(target) and not force:
+        try:
+            previous = read_header(target).get("source")
+        except (OSError, ValueError):
+            previous = None
+    fingerprint = file_fingerprint(source, previous)
+    if previous and previous.get("sha256") == fingerprint["sha256"] and previous.get("quantization") == quantization:
+        return None
+
+    fingerprint["quantization"] = quantization
+    write_topobin(list(iter_features(source)), target, quantization, source=fingerprint)
+    return target
+
+
+if __name__ == "__main__":
+    for name, source in list_layers(FEATURES_ROOT).items():
+        target = convert_layer(source)
+        if target is None:
+            print(f"SKIP: {name} (unchanged)")
+            continue
+
+        started = time.perf_counter()
+        with open(source) as f:
+            json.load(f)
+        json_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with TopoBinLayer(target) as layer:
+            for _ in layer:
+                pass
+        binary_seconds = time.perf_counter() - started
+
+        source_kb = os.path.getsize(source) / 1024
+        target_kb = os.path.getsize(target) / 1024
+        print(f"{name}: {source_kb:.1f} KB -> {target_kb:.1f} KB ({100 * target_kb / source_kb:.1f}%), "
+              f"decode {json_seconds * 1000:.0f} ms -> {binary_seconds * 1000:.0f} ms")